@@ -1,5 +1,6 @@
 import bpy
 from .addon import ui
+from .neox_tools.import_ops import release_global_undo
 
 bl_info = {
     "name": "Identity V Model Importer Tools",
@@ -15,8 +16,12 @@ def register():
     for cls in ui.classes:
         bpy.utils.register_class(cls)
         ui.register_props()
+    if release_global_undo not in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.append(release_global_undo)
 
 def unregister():
+    if release_global_undo in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(release_global_undo)
     for cls in reversed(ui.classes):
         bpy.utils.unregister_class(cls)
     
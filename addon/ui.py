@@ -2,7 +2,7 @@ import bpy
 from ..extract_frame_dump import extract_frame_dump
 from ..set_textures import set_textures
 from ..export_mod.export_ops import Export3DMigoto
-from ..neox_tools.import_ops import IDVMI_OT_Import_Neox_Mesh
+from ..neox_tools.import_ops import IDVMI_OT_Import_Neox_Mesh, IDVMI_OT_Import_Neox_Mesh_Batch, IDVMI_OT_Import_Neox_Mesh_Modal, IDVMI_OT_Add_Neox_Vertex_Groups
 from ..neox_tools.export_ops import IDVMI_OT_Export_Neox_Mesh
 
 class IDVMI_PT_tools(bpy.types.Panel):
@@ -64,14 +64,38 @@ class IDVMI_PT_tools(bpy.types.Panel):
             # neox_box_import = layout.box()
             folder_selectors.label(text="NeoX Mesh")
             folder_selectors.prop(scene, "neox_mesh_selector", text="")
+            layout.prop(scene, "neox_lod_level")
             layout.operator("idvmi_tools.neox_importer", icon="IMPORT")
 
+            batch_selectors = layout.box()
+            batch_selectors.label(text="NeoX Mesh Folder / Glob")
+            batch_selectors.prop(scene, "neox_batch_selector", text="")
+            layout.operator("idvmi_tools.neox_batch_importer", icon="IMPORT")
+            layout.operator("idvmi_tools.neox_modal_importer", icon="TIME")
+            layout.operator("idvmi_tools.neox_add_vertex_groups", icon="GROUP_VERTEX")
+
+            layout.prop(context.scene, "neox_share_skeleton", text="Share Matching Armatures")
+            layout.prop(context.scene, "neox_single_undo", text="Single Undo Step")
+            layout.prop(context.scene, "neox_use_cache", text="Cache Decoded Meshes")
+            if context.scene.neox_use_cache:
+                box_cache = layout.box()
+                box_cache.label(text="Cache Folder")
+                box_cache.prop(scene, "neox_cache_dir", text="")
+                box_cache.prop(scene, "neox_cache_size")
+
+            layout.prop(context.scene, "neox_profile_import", text="Profile Import Stages")
+            if context.scene.neox_profile_import:
+                box_profile = layout.box()
+                box_profile.label(text="Profile Log (JSON lines, optional)")
+                box_profile.prop(scene, "neox_profile_log", text="")
+
         elif scene.action_selector == 'OPT_Export_Neox_Mesh':
             # neox_box_import = layout.box()
             layout.prop(context.scene, "flip_uv_y", text="Flip UV (Y axis)")
+            layout.prop(context.scene, "neox_normalize_weights", text="Normalize Weights")
             layout.operator("idvmi_tools.neox_exporter", icon="EXPORT")
 
-classes = (IDVMI_PT_tools, extract_frame_dump.IDVMI_OT_extract_frame_dump, set_textures.IDVMI_OT_set_textures, Export3DMigoto, IDVMI_OT_Import_Neox_Mesh, IDVMI_OT_Export_Neox_Mesh)
+classes = (IDVMI_PT_tools, extract_frame_dump.IDVMI_OT_extract_frame_dump, set_textures.IDVMI_OT_set_textures, Export3DMigoto, IDVMI_OT_Import_Neox_Mesh, IDVMI_OT_Import_Neox_Mesh_Batch, IDVMI_OT_Import_Neox_Mesh_Modal, IDVMI_OT_Add_Neox_Vertex_Groups, IDVMI_OT_Export_Neox_Mesh)
 
 def register_props():
     bpy.types.Scene.flip_uv_y = bpy.props.BoolProperty(
@@ -80,6 +104,12 @@ def register_props():
         default=False
     )
 
+    bpy.types.Scene.neox_normalize_weights = bpy.props.BoolProperty(
+        name="Normalize Weights",
+        description="Scales the 4 exported weights of every vertex to sum to 1",
+        default=False
+    )
+
     bpy.types.Scene.neox_mesh_selector = bpy.props.StringProperty(
         name="NeoX Mesh Selector",
         description="Select a .mesh file",
@@ -87,6 +117,65 @@ def register_props():
         default=""     # .blend'e göre relatif
     )
 
+    bpy.types.Scene.neox_batch_selector = bpy.props.StringProperty(
+        name="NeoX Mesh Batch Selector",
+        description="Select a folder of .mesh files or type a glob pattern like //meshes/*_lod0.mesh",
+        subtype='DIR_PATH',
+        default=""
+    )
+
+    bpy.types.Scene.neox_lod_level = bpy.props.IntProperty(
+        name="LOD Level",
+        description="Only imports the submeshes of this LOD level, -1 imports every level",
+        default=-1,
+        min=-1
+    )
+
+    bpy.types.Scene.neox_share_skeleton = bpy.props.BoolProperty(
+        name="Share Matching Armatures",
+        description="Binds imported meshes to an armature already in the scene with the same bones instead of building a new one. Exporting that armature writes all of its meshes into one file, which is refused when the first file has several LOD levels",
+        default=False
+    )
+
+    bpy.types.Scene.neox_single_undo = bpy.props.BoolProperty(
+        name="Single Undo Step",
+        description="Builds the objects in a new collection that is linked in at the end as one undo step. Undo is suspended meanwhile, except during background imports",
+        default=False
+    )
+
+    bpy.types.Scene.neox_use_cache = bpy.props.BoolProperty(
+        name="Cache Decoded Meshes",
+        description="Keeps decoded .mesh files on disk so importing the same file again skips decoding",
+        default=False
+    )
+
+    bpy.types.Scene.neox_cache_dir = bpy.props.StringProperty(
+        name="NeoX Cache Folder",
+        description="Select a folder for the decoded mesh cache",
+        subtype='DIR_PATH',
+        default=""
+    )
+
+    bpy.types.Scene.neox_cache_size = bpy.props.IntProperty(
+        name="Cache Size (MB)",
+        description="Least recently used meshes are removed once the cache grows past this size",
+        default=1024,
+        min=16
+    )
+
+    bpy.types.Scene.neox_profile_import = bpy.props.BoolProperty(
+        name="Profile Import Stages",
+        description="Times every import stage and reports wall time and allocated blocks per stage",
+        default=False
+    )
+
+    bpy.types.Scene.neox_profile_log = bpy.props.StringProperty(
+        name="NeoX Profile Log",
+        description="Select a file the stage timings are appended to as JSON lines, leave empty to only report them",
+        subtype='FILE_PATH',
+        default=""
+    )
+
     bpy.types.Scene.action_selector = bpy.props.EnumProperty(
         name="Action Selector",
         description="Select the action you want to do",
@@ -177,8 +266,28 @@ def register_props():
 def unregister_props():
     if hasattr(bpy.types.Scene, "flip_uv_y"):
         del bpy.types.Scene.flip_uv_y
+    if hasattr(bpy.types.Scene, "neox_normalize_weights"):
+        del bpy.types.Scene.neox_normalize_weights
     if hasattr(bpy.types.Scene, "neox_mesh_selector"):
         del bpy.types.Scene.neox_mesh_selector
+    if hasattr(bpy.types.Scene, "neox_batch_selector"):
+        del bpy.types.Scene.neox_batch_selector
+    if hasattr(bpy.types.Scene, "neox_lod_level"):
+        del bpy.types.Scene.neox_lod_level
+    if hasattr(bpy.types.Scene, "neox_share_skeleton"):
+        del bpy.types.Scene.neox_share_skeleton
+    if hasattr(bpy.types.Scene, "neox_single_undo"):
+        del bpy.types.Scene.neox_single_undo
+    if hasattr(bpy.types.Scene, "neox_use_cache"):
+        del bpy.types.Scene.neox_use_cache
+    if hasattr(bpy.types.Scene, "neox_cache_dir"):
+        del bpy.types.Scene.neox_cache_dir
+    if hasattr(bpy.types.Scene, "neox_cache_size"):
+        del bpy.types.Scene.neox_cache_size
+    if hasattr(bpy.types.Scene, "neox_profile_import"):
+        del bpy.types.Scene.neox_profile_import
+    if hasattr(bpy.types.Scene, "neox_profile_log"):
+        del bpy.types.Scene.neox_profile_log
 
     if hasattr(bpy.types.Scene, "frame_dump_selector"):
         del bpy.types.Scene.frame_dump_selector
@@ -0,0 +1,126 @@
+import glob
+import importlib
+import multiprocessing
+import os
+import sys
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, Union
+
+from .neox_mesh import NeoXMesh
+from .neox_mesh_parser import decode_lod, decode_mesh
+
+
+def find_mesh_files(source: str) -> list[str]:
+    """.mesh files in a directory, or the files matching a glob pattern."""
+    if os.path.isdir(source):
+        source = os.path.join(source, "*.mesh")
+    return sorted(path for path in glob.glob(source) if os.path.isfile(path))
+
+
+def decode_mesh_file(mesh_path: str, lod_level: int = -1) -> dict:
+    """Pool worker: decode one file and hand back plain arrays for pickling."""
+    with open(mesh_path, "rb") as mesh_file:
+        if lod_level < 0:
+            return decode_mesh(mesh_file).to_dict()
+        return decode_lod(mesh_file, lod_level).to_dict()
+
+
+@contextmanager
+def worker_module():
+    """This module under the top level name `neox_tools`, for the lifetime of one pool.
+
+    Spawned workers unpickle the worker function by module name. Importing it through the
+    add-on package would run the add-on's __init__, which needs bpy, so neox_tools is
+    imported on its own from the add-on root. Yields (module, release_path): call
+    release_path() once the workers are spawned, they keep the path they started with.
+    The top level copy stays loaded while work items are pickled and is dropped on exit.
+    """
+    addon_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    added_path = addon_root not in sys.path
+    loaded = set(sys.modules)
+
+    def release_path():
+        if added_path and addon_root in sys.path:
+            sys.path.remove(addon_root)
+
+    if added_path:
+        sys.path.append(addon_root)
+    try:
+        yield importlib.import_module("neox_tools.batch_decode"), release_path
+    finally:
+        release_path()
+        for name in set(sys.modules) - loaded:
+            if name == "neox_tools" or name.startswith("neox_tools."):
+                del sys.modules[name]
+
+
+def decode_mesh_files(mesh_paths: list[str], max_workers: int = None, cache=None,
+                      lod_level: int = -1) -> Iterator[tuple[str, Union[NeoXMesh, Exception]]]:
+    """Decode files in a process pool, yielding (path, mesh or exception) as each one finishes.
+
+    The caller consumes the results on its own thread, so Blender objects can be built
+    while the remaining files are still decoding. With a MeshCache, every file is hashed
+    once, the misses go to the pool first and the hits are loaded while it works; fresh
+    results are stored back. The cache only holds whole meshes, so it's bypassed when a
+    single `lod_level` is asked for.
+    """
+    if cache is None or lod_level >= 0:
+        yield from decode_in_pool(mesh_paths, max_workers, lod_level)
+        return
+
+    keys = {mesh_path: cache.file_key(mesh_path) for mesh_path in mesh_paths}
+    hits = [mesh_path for mesh_path in mesh_paths if cache.contains(keys[mesh_path])]
+    missed = [mesh_path for mesh_path in mesh_paths if mesh_path not in set(hits)]
+
+    def load_hits():
+        for mesh_path in hits:
+            mesh = cache.load(keys[mesh_path])
+            if mesh is None:
+                # the entry was broken and load() dropped it, decode this one here
+                try:
+                    mesh = NeoXMesh.from_dict(decode_mesh_file(mesh_path))
+                    cache.store(keys[mesh_path], mesh)
+                except Exception as e:
+                    mesh = e
+            yield mesh_path, mesh
+
+    decoded = set(missed)
+    for mesh_path, mesh in decode_in_pool(missed, max_workers, lod_level, meanwhile=load_hits()):
+        if mesh_path in decoded and not isinstance(mesh, Exception):
+            cache.store(keys[mesh_path], mesh)
+        yield mesh_path, mesh
+
+
+def decode_in_pool(mesh_paths: list[str], max_workers: int = None, lod_level: int = -1,
+                   meanwhile=()) -> Iterator[tuple[str, Union[NeoXMesh, Exception]]]:
+    """decode_mesh_files() without the cache. `meanwhile` is yielded from once every file
+    is submitted, before the first decoded result."""
+    max_workers = min(max_workers or os.cpu_count() or 1, len(mesh_paths))
+    if max_workers <= 1:
+        yield from meanwhile
+        for mesh_path in mesh_paths:
+            try:
+                yield mesh_path, NeoXMesh.from_dict(decode_mesh_file(mesh_path, lod_level))
+            except Exception as e:
+                yield mesh_path, e
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with worker_module() as (module, release_path), \
+            ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {executor.submit(module.decode_mesh_file, mesh_path, lod_level): mesh_path
+                   for mesh_path in mesh_paths}
+        # workers are only spawned by submit(), so all of them are running by now
+        release_path()
+        try:
+            yield from meanwhile
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], NeoXMesh.from_dict(future.result())
+                except Exception as e:
+                    yield futures[future], e
+        finally:
+            # Closing the generator early only waits for the files already being decoded
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,82 @@
+"""Throughput of the NeoX mesh decoders on synthetic files, no Blender needed.
+
+Run from the add-on folder:  python -m neox_tools.benchmark --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from .neox_mesh_parser import decode_mesh, decode_submeshes, parse_mesh_mapped
+from .synthetic_mesh import write_mesh
+from .validation import validate_mesh
+
+VARIANTS = {
+    'uint16': {},
+    'uint8': {'index_width': 1},
+    'uint16 bare': {'tangents': False, 'bounding_info': False},
+    'uint16 3uv+color': {'uv_layers': 3, 'color_len': 1, 'submesh_count': 4},
+}
+
+
+def decode_file(mesh_path):
+    with open(mesh_path, "rb") as mesh_file:
+        return decode_mesh(mesh_file)
+
+
+def decode_first_submesh(mesh_path):
+    with open(mesh_path, "rb") as mesh_file:
+        return decode_submeshes(mesh_file, [0])
+
+
+DECODERS = {
+    'decode_mesh': decode_file,
+    'parse_mesh_mapped': parse_mesh_mapped,
+    'decode_submeshes[0]': decode_first_submesh,
+    'decode+validate': lambda mesh_path: validate_mesh(decode_file(mesh_path)),
+}
+
+
+def measure(decoder, mesh_path, repeat: int) -> tuple[float, int]:
+    """Best wall time of `repeat` runs and the peak traced memory of one run."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = decoder(mesh_path)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    tracemalloc.start()
+    result = decoder(mesh_path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def run(sizes, variants, repeat: int, bone_count: int):
+    print(f"{'variant':<18}{'vertices':>10}{'file MB':>9}  {'decoder':<21}{'ms':>9}{'Mvert/s':>9}{'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for variant in variants:
+            for vertex_count in sizes:
+                mesh_path = os.path.join(temp_dir, "bench.mesh")
+                size = write_mesh(mesh_path, vertex_count=vertex_count, bone_count=bone_count, **VARIANTS[variant])
+                for name, decoder in DECODERS.items():
+                    seconds, peak = measure(decoder, mesh_path, repeat)
+                    print(f"{variant:<18}{vertex_count:>10}{size / 2**20:>9.1f}  {name:<21}"
+                          f"{seconds * 1000:>9.2f}{vertex_count / seconds / 1e6:>9.1f}{peak / 2**20:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--bones', type=int, default=200)
+    args = parser.parse_args()
+    run(args.sizes, args.variants, args.repeat, args.bones)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import bpy, os , math
 import bmesh
-from mathutils import Matrix, Vector
+from mathutils import Matrix
 from bpy.props import StringProperty
 from bpy_extras.io_utils import ExportHelper, axis_conversion
-from .export_utils import writeuint8, writeuint16, writeuint32, writefloat
+from .export_utils import writeuint8, writeuint16, writeuint32
+from .neox_mesh import LODTable
+from .neox_metadata import RoundTripMetadata
+import numpy as np
 
 class IDVMI_OT_Export_Neox_Mesh(bpy.types.Operator, ExportHelper):
     bl_idname = "idvmi_tools.neox_exporter"
@@ -40,15 +43,16 @@ class IDVMI_OT_Export_Neox_Mesh(bpy.types.Operator, ExportHelper):
                 self.report({'ERROR'}, "Please select an armature that has mesh(es)")
                 return {'CANCELLED'}
 
-        export_neox_mesh(
+        result = export_neox_mesh(
             export_path,
-            parse_blender_meshes(arm_obj, flip_uv_y),
+            parse_blender_meshes(arm_obj, flip_uv_y, context.scene.neox_normalize_weights),
             arm_obj,
             self
         )
 
-        self.report({'INFO'}, f"Export OK → {export_path}")
-        return {'FINISHED'}
+        if result == {'FINISHED'}:
+            self.report({'INFO'}, f"Export OK → {export_path}")
+        return result
 
 # def parse_skeleton(skeleton_path, operator):
 #     with open(skeleton_path, "r") as skeleton:
@@ -56,7 +60,72 @@ class IDVMI_OT_Export_Neox_Mesh(bpy.types.Operator, ExportHelper):
 
 #     return parsed
 
-def parse_blender_meshes(armature, flip_uv_y) -> dict:
+def tangent_source(mesh):
+    """`mesh` itself when it's all tris and quads, else a temporary copy with its n-gons triangulated.
+
+    The copy keeps vertex order and the active UV layer, and the caller removes it. No mode
+    switch is needed and the user's mesh is left untouched.
+    """
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    if not (loop_totals > 4).any():
+        return mesh
+
+    mesh = mesh.copy()
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    ngons = [f for f in bm.faces if len(f.verts) > 4]
+    bmesh.ops.triangulate(
+        bm, faces=ngons,
+        quad_method='BEAUTY',   # tri/quad varsa dokunmuyor
+        ngon_method='BEAUTY'
+    )
+    bm.to_mesh(mesh)
+    bm.free()
+    return mesh
+
+def loop_vertex_indices(mesh) -> np.ndarray:
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    return loop_vertices
+
+def loop_sums(loop_vertices, loop_values, vertex_count: int):
+    """Per-vertex sums of per-loop values and the number of loops of each vertex."""
+    sums = np.stack([np.bincount(loop_vertices, weights=column, minlength=vertex_count)
+                     for column in loop_values.T], axis=1)
+    return sums, np.bincount(loop_vertices, minlength=vertex_count)
+
+def top_influences(vertex, bone, weight, vertex_count: int, limit: int = 4, normalize: bool = False):
+    """Dense (vertex_count, limit) uint16 joints and float32 weights from sparse influence triplets.
+
+    Triplets are grouped by vertex, in vertex.groups order. Each vertex keeps its `limit`
+    heaviest influences; on ties the earlier listed one goes first, as it did when the
+    smallest was removed one at a time. Survivors stay in vertex.groups order and empty
+    slots are joint 65535 with weight 0.
+    """
+    counts = np.bincount(vertex, minlength=vertex_count)
+    slot = np.arange(len(vertex)) - np.repeat(np.cumsum(counts) - counts, counts)
+    width = max(limit, int(counts.max()) if vertex_count else 0)
+
+    dense_bone = np.full((vertex_count, width), 65535, dtype=np.uint16)
+    dense_weight = np.zeros((vertex_count, width), dtype=np.float32)
+    dense_bone[vertex, slot] = bone
+    dense_weight[vertex, slot] = weight
+
+    if width > limit:
+        # positive float32 bits sort like the floats, the slot breaks ties; empty slots rank last
+        rank = np.full((vertex_count, width), -1, dtype=np.int64)
+        rank[vertex, slot] = (weight.astype(np.float32).view(np.int32).astype(np.int64) << 16) | slot
+        survivors = np.sort(np.argpartition(-rank, limit - 1, axis=1)[:, :limit], axis=1)
+        dense_bone = np.take_along_axis(dense_bone, survivors, axis=1)
+        dense_weight = np.take_along_axis(dense_weight, survivors, axis=1)
+
+    if normalize:
+        total = dense_weight.sum(axis=1, keepdims=True)
+        np.divide(dense_weight, total, out=dense_weight, where=total > 0)
+    return dense_bone, dense_weight
+
+def parse_blender_meshes(armature, flip_uv_y, normalize_weights=False) -> dict:
     # --- Eksen dönüşümleri ---
     M_blender_to_game = axis_conversion(
     from_forward='-Y', from_up='Z',   # Blender’ın yönleri
@@ -71,10 +140,8 @@ def parse_blender_meshes(armature, flip_uv_y) -> dict:
     mesh_data = {}
 
     
-    mesh_data['bone_tail'] = armature['NeoX:BoneTail']
     mesh_data['bone_name'] = armature['NeoX:BoneOrder'] 
     mesh_data['bone_parent'] = []   
-    mesh_data['bone_original_matrix'] = armature['Neox:BoneMatrix']
 
     bone_index = {name: idx for idx, name in enumerate(mesh_data['bone_name'])}
     # bone_name = {idx: name for idx, name in enumerate(mesh_data['bone_name'])}
@@ -94,155 +161,76 @@ def parse_blender_meshes(armature, flip_uv_y) -> dict:
         # M_game_global = M_blender_to_game.inverted() @ armature.matrix_world @ bone.matrix_local @ M_blender_to_game
         # mesh_data['bone_original_matrix'].append(M_game_global.transposed())
 
+    # Row vectors times M_vert, the same as `v.co @ M_vert` for every vertex at once
+    axis_matrix = np.array(M_vert, dtype=np.float32)
+
     mesh_data['mesh'] = []
     for child in armature.children_recursive:
         if child.type == 'MESH':
-            positions = [v.co.copy() @ M_vert for v in child.data.vertices]
-            normals = [v.normal.copy() @ M_vert for v in child.data.vertices]
+            vertex_count = len(child.data.vertices)
+            positions = np.empty(vertex_count * 3, dtype=np.float32)
+            child.data.vertices.foreach_get("co", positions)
+            positions = positions.reshape(-1, 3) @ axis_matrix
+
+            normals = np.empty(vertex_count * 3, dtype=np.float32)
+            child.data.vertices.foreach_get("normal", normals)
+            normals = normals.reshape(-1, 3) @ axis_matrix
 
             child.data.calc_loop_triangles()
-            faces = [tri.vertices for tri in child.data.loop_triangles]
+            faces = np.empty(len(child.data.loop_triangles) * 3, dtype=np.int32)
+            child.data.loop_triangles.foreach_get("vertices", faces)
+            faces = faces.reshape(-1, 3)
 
             uv_layer = child.data.uv_layers.active.data
 
-            uv_sum = [Vector((0.0, 0.0)) for _ in child.data.vertices]
-            uv_cnt = [0]*len(child.data.vertices)
-
-            for l in child.data.loops:
-                uv = uv_layer[l.index].uv
-                vi = l.vertex_index
-                uv_sum[vi] += uv
-                uv_cnt[vi] += 1
-
-            if not flip_uv_y:
-                uv_vertex = [ (uv_sum[i] / uv_cnt[i]) if uv_cnt[i] else Vector((0.0,0.0))
-                        for i in range(len(child.data.vertices)) ]
-            else:
-                uv_vertex = [
-        Vector((uv_sum[i].x / uv_cnt[i],
-                1.0 - (uv_sum[i].y / uv_cnt[i])))  # Y ekseninde mirror
-        if uv_cnt[i] else Vector((0.0, 0.0))
-        for i in range(len(child.data.vertices))
-]
+            # Average the loop UVs of every vertex
+            loop_vertices = loop_vertex_indices(child.data)
+            loop_uv = np.empty(len(loop_vertices) * 2, dtype=np.float32)
+            uv_layer.foreach_get("uv", loop_uv)
+            uv_sum, uv_cnt = loop_sums(loop_vertices, loop_uv.reshape(-1, 2), vertex_count)
+
+            used = uv_cnt > 0
+            uv_vertex = np.zeros((vertex_count, 2), dtype=np.float32)
+            uv_vertex[used] = uv_sum[used] / uv_cnt[used, None]
+            if flip_uv_y:
+                uv_vertex[used, 1] = 1.0 - uv_vertex[used, 1]  # Y ekseninde mirror
             # uv_vertex: vertex başına 2-float
 
-            # Sadece n-gon'ları üçgenle            
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-            bm = bmesh.new()
-            bm.from_mesh(child.data)
-
-            ngons = [f for f in bm.faces if len(f.verts) > 4]
-            if ngons:
-                bmesh.ops.triangulate(
-                    bm, faces=ngons,
-                    quad_method='BEAUTY',   # tri/quad varsa dokunmuyor
-                    ngon_method='BEAUTY'
-                )
-                bm.to_mesh(child.data)
-
-            bm.free()
-            bpy.ops.object.mode_set(mode='EDIT')
-
-            child.data.update()
-
-            child.data.calc_tangents()  # aktif UV üzerinden
-
-            acc = [Vector((0,0,0)) for _ in child.data.vertices]
-            cnt = [0]*len(child.data.vertices)
-            for l in child.data.loops:
-                acc[l.vertex_index] += l.tangent
-                cnt[l.vertex_index] += 1
-            vert_tangent = [(acc[i]/cnt[i]).normalized() if cnt[i] else Vector((1,0,0))
-                            for i in range(len(child.data.vertices))]
-            
-            vert_tangent = [t @ M_vert for t in vert_tangent]  # w=0 mantığıyla
-
-            vgroups = list(child.vertex_groups)
-
-            # Bone isimlerinden sıra: name -> bone_idx (zaten var)
-            # bone_index = {b.name:i for i,b in enumerate(armature.data.bones)}
-
-            # VG'leri bone sırasına göre sırala (eşleşmeyenler sona)
-            sorted_vgroups = sorted(
-                vgroups,
-                key=lambda vg: bone_index.get(vg.name, len(mesh_data['bone_name']))
-            )
-
-            # vg.index -> (bone_index, rank) haritaları
-            vg_to_bone = {vg.index: bone_index.get(vg.name, -1) for vg in child.vertex_groups}
-            vg_rank    = {vg.index: (i if vg.name in bone_index else len(mesh_data['bone_name']) + i)
-                        for i, vg in enumerate(sorted_vgroups)}
-
-            topk = 4
-            joints  = []
-            weights = []
-
-            # for v in child.data.vertices:
-                # (rank, bone_index, weight) listesi topla
-                # triples = []
-                # for g in v.groups:
-                #     bi = vg_to_bone.get(g.group, -1)
-                #     if bi >= 0 and g.weight > 0.0:
-                        # r = vg_rank.get(g.group, 10**9)  # eşleşmeyen en sona
-                        # triples.append((r, bi, g.weight))
-
-                # Ağırlığa göre top-k seç
-                # triples.sort(key=lambda t: t[2], reverse=True)   # weight desc
-                # triples = triples[:topk]
-
-                # Pad
-                # while len(triples) < topk:
-                #     triples.append((10**9, 65535, 0.0))  # rank büyük, weight 0
-
-                # Çıktıyı bone sırasına (rank) göre sabitle
-                # triples.sort(key=lambda t: t[0])     # rank asc
-
-                # idxs = [t[1] for t in triples]
-                # wts  = [t[2] for t in triples]
-
-                # Normalize
-                # s = sum(wts)
-                # if s > 0.0:
-                #     wts = [w/s for w in wts]
-                
-                # joints.append(idxs)
-                # weights.append(wts)
-            vertex_group_names = {}
-            for vertex_group in child.vertex_groups:
-                vertex_group_names[vertex_group.index] = vertex_group.name
-            
-            current_weights = {}
-            for n, vertex in enumerate(child.data.vertices):
-                current_weights[n] = []
-                for group in vertex.groups:
-                    if group.weight > 0.0:
-                        current_weights[n].append(group)
-
-                while len(current_weights[n]) > 4:
-                    smallest = None
-                    for group in current_weights[n]:
-                        if smallest == None or group.weight < smallest.weight:
-                            smallest = group
-                    current_weights[n].remove(smallest)
-
-                while len(current_weights[n]) < 4:
-                    current_weights[n].append(None)
-
-            joints = []
-            weights = []
-            for vertex_index in current_weights:
-                vertex_joints = []
-                vertex_weights = []                
-                for group in current_weights[vertex_index]:
-                    if group == None:
-                        vertex_weights.append(0.0)
-                        vertex_joints.append(65535)
-                    else:
-                        vertex_weights.append(group.weight)
-                        vertex_joints.append(bone_index[vertex_group_names[group.group]])
-                joints.append(vertex_joints)
-                weights.append(vertex_weights)
+            # calc_tangents() only takes tris and quads; n-gons are split on a copy
+            tangent_mesh = tangent_source(child.data)
+            try:
+                tangent_mesh.calc_tangents()  # aktif UV üzerinden
+
+                # Average the loop tangents of every vertex (loops changed if n-gons were split)
+                loop_vertices = loop_vertex_indices(tangent_mesh)
+                loop_tangent = np.empty(len(loop_vertices) * 3, dtype=np.float32)
+                tangent_mesh.loops.foreach_get("tangent", loop_tangent)
+                tangent_sum, tangent_cnt = loop_sums(loop_vertices, loop_tangent.reshape(-1, 3), vertex_count)
+            finally:
+                # the copy must not outlive a failed calc_tangents(), a mesh without UVs for one
+                if tangent_mesh is not child.data:
+                    bpy.data.meshes.remove(tangent_mesh)
+
+            # normalizing the sum is normalizing the mean, zero-length sums stay zero
+            length = np.linalg.norm(tangent_sum, axis=1, keepdims=True)
+            vert_tangent = np.divide(tangent_sum, length, out=np.zeros_like(tangent_sum), where=length > 0)
+            vert_tangent[tangent_cnt == 0] = (1.0, 0.0, 0.0)
+
+            vert_tangent = vert_tangent.astype(np.float32) @ axis_matrix  # w=0 mantığıyla
+
+            # (vertex, bone, weight) triplets in vertex.groups order, groups that aren't bones dropped
+            group_bone = np.array([bone_index.get(vg.name, -1) for vg in child.vertex_groups], dtype=np.int64)
+            influences = [(vertex.index, group.group, group.weight)
+                          for vertex in child.data.vertices for group in vertex.groups]
+            influences = np.array(influences, dtype=np.float64).reshape(-1, 3)
+
+            influence_vertex = influences[:, 0].astype(np.int64)
+            influence_bone = group_bone[influences[:, 1].astype(np.int64)]
+            influence_weight = influences[:, 2].astype(np.float32)
+            keep = (influence_weight > 0.0) & (influence_bone >= 0)
+
+            joints, weights = top_influences(influence_vertex[keep], influence_bone[keep], influence_weight[keep],
+                                             vertex_count, normalize=normalize_weights)
 
             # if child.name.endswith("0"):
             #     seen = {}
@@ -262,9 +250,56 @@ def parse_blender_meshes(armature, flip_uv_y) -> dict:
     
     return mesh_data
     
+def armature_metadata(arm_obj) -> RoundTripMetadata:
+    """Round-trip metadata of an imported armature.
+
+    Reads the packed NeoX:Metadata blob, or the per-bone properties that older imports
+    stored instead. Raises ValueError when the bones no longer match the imported ones.
+    """
+    if 'NeoX:Metadata' in arm_obj:
+        metadata = RoundTripMetadata.unpack(bytes(arm_obj['NeoX:Metadata']))
+    else:
+        bounding_info = None
+        if arm_obj.get('NeoX:BoundingInfo'):
+            if any("NeoX:BoundingInfo" not in pbone for pbone in arm_obj.pose.bones):
+                raise ValueError("Adding/Deleting bones isn't supported for now")
+            bounding_info = np.array([pbone["NeoX:BoundingInfo"] for pbone in arm_obj.pose.bones], dtype=np.float32)
+        metadata = RoundTripMetadata(
+            np.array(arm_obj['Neox:BoneMatrix'], dtype=np.float32).reshape(-1, 16),
+            bounding_info,
+            bytes(arm_obj['NeoX:BoneTail']),
+            bytes(arm_obj['NeoX:LODTable']),
+        )
+
+    # also catches skeletons with several roots: their dummy root has no bounding info row
+    if metadata.bounding_info is not None and len(metadata.bounding_info) != len(arm_obj.pose.bones):
+        raise ValueError("Adding/Deleting bones isn't supported for now")
+    return metadata
+
 def export_neox_mesh(export_path:os.PathLike, mesh_data:dict, arm_obj, operator):
     bpy.ops.object.mode_set(mode='OBJECT')
-        
+
+    try:
+        metadata = armature_metadata(arm_obj)
+    except ValueError as e:
+        operator.report({'ERROR'}, f"{e}")
+        return {'CANCELLED'}
+
+    # Meshes of other files sharing this armature would silently land in the last LOD level
+    submesh_count = len(mesh_data['mesh'])
+    described = arm_obj.get('NeoX:SubmeshCount')
+    if described is not None and submesh_count > described and \
+            len(LODTable.decode(metadata.lod_data_table).levels(submesh_count)) > 1:
+        operator.report({'ERROR'}, f"{arm_obj.name} has {submesh_count} meshes but its LOD table only "
+                                   f"describes {described}, import those files without sharing armatures to export them")
+        return {'CANCELLED'}
+
+    vertex_count = sum(len(mesh_info['position']) for mesh_info in mesh_data['mesh'])
+    if vertex_count > 65536:
+        operator.report({'ERROR'}, f"{vertex_count} vertices can't be indexed by 16-bit faces, the limit is 65536")
+        return {'CANCELLED'}
+
+    # The header is small and built in memory, vertex data is streamed section by section
     with open(export_path, "wb") as file:
         file_data = bytearray()
 
@@ -275,8 +310,7 @@ def export_neox_mesh(export_path:os.PathLike, mesh_data:dict, arm_obj, operator)
         bone_count = len(mesh_data['bone_name'])
         file_data += writeuint16(bone_count)
 
-        for parent_idx in mesh_data['bone_parent']:
-            file_data += writeuint16(parent_idx)
+        file_data += np.asarray(mesh_data['bone_parent'], dtype='<u2').tobytes()
         # for parent in arm_obj['NeoX:BoneParent']:
         #     parent = 65535 if parent == -1 else parent
         #     file_data += writeuint16(parent)
@@ -286,44 +320,22 @@ def export_neox_mesh(export_path:os.PathLike, mesh_data:dict, arm_obj, operator)
         # for n in range(bone_count):
         #     file_data += arm_obj['NeoX:BoneOrder'][n].encode('utf-8').ljust(32, b"\x00")
 
-        if "NeoX:BoundingInfo" not in arm_obj or not arm_obj["NeoX:BoundingInfo"]:
+        if metadata.bounding_info is None:
             file_data += writeuint8(0)
         else:
             file_data += writeuint8(1)
-            bpy.context.view_layer.objects.active = arm_obj
-            arm_obj.select_set(True)
-            bpy.ops.object.mode_set(mode='POSE')
-            for pbone in arm_obj.pose.bones:
-                try:
-                    for coordinate in pbone["NeoX:BoundingInfo"]:
-                        file_data += writefloat(coordinate)
-                except KeyError:
-                    operator.report({'ERROR'}, "Adding/Deleting bones isn't supported for now")
-                    return {'CANCELLED'}
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-        # for bone in mesh_data['bone_original_matrix']:
-        #     for coordinate in bone:                
-        #         x, y, z, w = coordinate
-        #         file_data += writefloat(x)
-        #         file_data += writefloat(y)
-        #         file_data += writefloat(z)
-        #         file_data += writefloat(w)
-        for matrixes in arm_obj['Neox:BoneMatrix']:
-            for matrix in matrixes:
-                file_data += writefloat(matrix)
+            file_data += metadata.bounding_info.astype('<f4').tobytes()
+
+        file_data += metadata.bone_matrix.astype('<f4').tobytes()
 
         file_data += writeuint8(0) # has_binding_info
         table_offset = len(file_data)
         file_data += writeuint32(0) # table_offset // will be updated
 
-        vertex_count = 0
         face_count = 0
 
         for mesh_info in mesh_data['mesh']:
-            vtx_count = len(mesh_info['position'])
-            file_data += writeuint32(vtx_count)
-            vertex_count += vtx_count
+            file_data += writeuint32(len(mesh_info['position']))
 
             fce_count = len(mesh_info['face'])
             file_data += writeuint32(fce_count)
@@ -335,77 +347,39 @@ def export_neox_mesh(export_path:os.PathLike, mesh_data:dict, arm_obj, operator)
         file_data += writeuint16(1) # lod_new_v
         file_data += writeuint32(vertex_count)
         file_data += writeuint32(face_count)
+        file.write(file_data)
 
-        for mesh_info in mesh_data['mesh']:
-            for position in mesh_info['position']:
-                x, y, z = position
-                file_data += writefloat(x)
-                file_data += writefloat(y)
-                file_data += writefloat(z)
-        # for positions in arm_obj['NeoX:OriginalPositions']:
-        #     for position in positions:
-        #         file_data += writefloat(position)
+        write_section(file, mesh_data, 'position', '<f4')
+        write_section(file, mesh_data, 'normal', '<f4')
 
-        for mesh_info in mesh_data['mesh']:
-            for normal in mesh_info['normal']:
-                x, y, z = normal
-                file_data += writefloat(x)
-                file_data += writefloat(y)
-                file_data += writefloat(z)        
-
-        file_data += writeuint16(1) # has tangent
-        for mesh_info in mesh_data['mesh']:
-            for tangent in mesh_info['tangent']:
-                x, y, z = tangent
-                file_data += writefloat(x)
-                file_data += writefloat(y)
-                file_data += writefloat(z)
+        file.write(writeuint16(1)) # has tangent
+        write_section(file, mesh_data, 'tangent', '<f4')
 
+        # Faces index the whole file's vertices, shift each submesh by the ones before it
         first_index = 0
         for mesh_info in mesh_data['mesh']:
-            for face in mesh_info['face']:
-                v1, v2, v3 = face
-                file_data += writeuint16(v1 + first_index)
-                file_data += writeuint16(v2 + first_index)
-                file_data += writeuint16(v3 + first_index)
+            faces = np.asarray(mesh_info['face'], dtype=np.int64).reshape(-1, 3) + first_index
+            file.write(faces.astype('<u2').tobytes())
             first_index += len(mesh_info['position'])
-        # for positions in arm_obj['NeoX:OriginalFaces']:
-        #     for position in positions:
-        #         file_data += writeuint16(position)
 
-        for mesh_info in mesh_data['mesh']:
-            for uv in mesh_info['uv']:
-                u, v = uv
-                file_data += writefloat(u)
-                file_data += writefloat(v)
+        write_section(file, mesh_data, 'uv', '<f4')
 
         # vertex color skipped
 
-        for mesh_info in mesh_data['mesh']:
-            for vertex_joint in mesh_info['vertex_joint']:
-                vg1, vg2, vg3, vg4 = vertex_joint
-                file_data += writeuint16(vg1)
-                file_data += writeuint16(vg2)
-                file_data += writeuint16(vg3)
-                file_data += writeuint16(vg4)
-        # for joints in arm_obj['NeoX:OriginalJoints']:
-        #     for joint in joints:
-        #         file_data += writeuint16(joint)
+        write_section(file, mesh_data, 'vertex_joint', '<u2')
+        write_section(file, mesh_data, 'vertex_joint_weight', '<f4')
 
-        for mesh_info in mesh_data['mesh']:
-            for vertex_joint_weight in mesh_info['vertex_joint_weight']:
-                vg1, vg2, vg3, vg4 = vertex_joint_weight                
-                file_data += writefloat(vg1)
-                file_data += writefloat(vg2)
-                file_data += writefloat(vg3)
-                file_data += writefloat(vg4)
-        # for weights in arm_obj['NeoX:OriginalWeights']:
-        #     for weight in weights:
-        #         file_data += writefloat(weight)
-
-        file_data += arm_obj['NeoX:BoneTail']
-
-        file_data[table_offset:table_offset+4] = writeuint32(len(file_data))
-        file_data += arm_obj['NeoX:LODTable']
-
-        file.write(file_data)
\ No newline at end of file
+        file.write(metadata.bone_tail)
+
+        table_position = file.tell()
+        file.seek(table_offset)
+        file.write(writeuint32(table_position))
+        file.seek(table_position)
+        file.write(metadata.lod_data_table)
+
+    return {'FINISHED'}
+
+def write_section(file, mesh_data: dict, key: str, dtype: str):
+    """Write one per-vertex section of every submesh, in submesh order."""
+    for mesh_info in mesh_data['mesh']:
+        file.write(np.ascontiguousarray(mesh_info[key], dtype=dtype).tobytes())
@@ -1,7 +1,17 @@
-from .neox_mesh_parser import parse_mesh_1, parse_mesh_2, parse_mesh_3
+from .neox_mesh_parser import decode_lod, decode_mesh, probe_mesh_file
+from .batch_decode import decode_mesh_files, find_mesh_files
+from .mesh_cache import MeshCache
+from .validation import validate_mesh
+from .import_timing import StageTimer
+from .neox_metadata import RoundTripMetadata
 import bpy
+import io
 import os
-from mathutils import Matrix, Vector
+import queue
+import threading
+import time
+import numpy as np
+from bpy.app.handlers import persistent
 from bpy_extras.io_utils import axis_conversion
 from math import pi
 
@@ -11,245 +21,601 @@ class IDVMI_OT_Import_Neox_Mesh(bpy.types.Operator):
 
     def execute(self, context):
         mesh_path = bpy.path.abspath(context.scene.neox_mesh_selector)
+        lod_level = context.scene.neox_lod_level
+        # the cache holds whole meshes, a single LOD is read straight from the file
+        cache = mesh_cache(context.scene) if lod_level < 0 else None
+        timer = StageTimer(context.scene.neox_profile_import)
 
-        with open(mesh_path, "rb") as mesh_file:           
-            is_parser_tried = {parse_mesh_1: False, parse_mesh_2: False, parse_mesh_3: False}
+        # Read the file once up front: the cache key is hashed from these bytes, the decoder
+        # parses them, and reading and decoding are timed apart
+        try:
+            with timer.stage('read'), open(mesh_path, "rb") as mesh_file:
+                data = mesh_file.read()
+        except OSError as e:
+            self.report({'ERROR'}, f"Can't read {mesh_path}: {e}")
+            return {'CANCELLED'}
 
-            for parser in is_parser_tried:
+        with timer.stage('cache'):
+            cache_key = cache.data_key(data) if cache else None
+            model = cache.load(cache_key) if cache else None
+        if model is None:
+            try:
+                mesh_format = probe_mesh_file(mesh_path)
+            except Exception as e:
+                self.report({'ERROR'}, f"Unknown mesh format: {e}")
+                return {'CANCELLED'}
+            print(f"NeoX mesh format: {mesh_format}")
+
+            mesh_file = io.BytesIO(data)
+            with timer.stage('decode'):
                 try:
-                    model = {}
-                    mesh_file.seek(0)
-                    is_parser_tried[parser] = True
-                    parser(model, mesh_file, self)
-                    for weights in model['vertex_weight']:
-                        for weight in weights:
-                            if type(weight) != float or weight > 1.0 or weight < 0.0:
-                                self.report({'ERROR'}, f"Incorrect weights")            
-                                continue
-                    break
+                    if lod_level < 0:
+                        model = decode_mesh(mesh_file, mesh_format, self)
+                    else:
+                        model = decode_lod(mesh_file, lod_level, mesh_format, self)
                 except Exception as e:
-                    self.report({'ERROR'}, f"{e}")                    
-                    model = {}
-                    continue
+                    self.report({'ERROR'}, f"{e}")
+                    model = None
 
-        if model == {}:
+            if model is not None and cache:
+                with timer.stage('cache'):
+                    cache.store(cache_key, model)
+        else:
+            print(f"NeoX mesh cache hit: {mesh_path}")
+
+        if model is None:
             self.report({'ERROR'}, "Model can't be decoded")
             return {'CANCELLED'}
+
+        with timer.stage('validation'):
+            accepted = check_mesh(model, os.path.basename(mesh_path), self)
+        if not accepted:
+            return {'CANCELLED'}
             
 
         obj_name = os.path.basename(mesh_path).rsplit(".", 1)[0]
-        import_per_material(model, obj_name, self)
+        bulk = BulkImport(context, obj_name, context.scene.neox_single_undo)
+        try:
+            import_per_material(model, obj_name, self, context.scene.neox_share_skeleton, timer, bulk.collection)
+        finally:
+            bulk.finish(context, f"Import NeoX Mesh {obj_name}")
         
         self.report({'INFO'}, f"Import OK → {mesh_path}")
+        report_timing(timer, self, context.scene, mesh=mesh_path)
         return {'FINISHED'}
-    
-        
-def import_per_material(model, obj_name: str, operator):
-    # --- Axis conversation ---
-    M_game_to_blender = axis_conversion(
-        from_forward='Z', from_up='Y',   # game 
-        to_forward='-Y',   to_up='Z'      # blender
-    ).to_4x4()    
 
-    # -- Armature --
+
+class IDVMI_OT_Import_Neox_Mesh_Batch(bpy.types.Operator):
+    bl_idname = "idvmi_tools.neox_batch_importer"
+    bl_label = "Import NeoX Meshes"
+
+    def execute(self, context):
+        source = bpy.path.abspath(context.scene.neox_batch_selector)
+        mesh_paths = find_mesh_files(source)
+        if not mesh_paths:
+            self.report({'ERROR'}, f"No .mesh files found in {source}")
+            return {'CANCELLED'}
+
+        # Decoding runs in worker processes, Blender objects are built here as results arrive
+        # ('decode' times how long this thread waits on them)
+        timer = StageTimer(context.scene.neox_profile_import)
+        results = decode_mesh_files(mesh_paths, cache=mesh_cache(context.scene),
+                                    lod_level=context.scene.neox_lod_level)
+        bulk = BulkImport(context, "NeoX Import", context.scene.neox_single_undo)
+        imported = 0
+        try:
+            for mesh_path, model in timed_results(results, timer, 'decode'):
+                mesh_name = os.path.basename(mesh_path)
+                if isinstance(model, Exception):
+                    self.report({'WARNING'}, f"{mesh_name} can't be decoded: {model}")
+                    continue
+
+                with timer.stage('validation'):
+                    accepted = check_mesh(model, mesh_name, self)
+                if not accepted:
+                    continue
+
+                try:
+                    import_per_material(model, mesh_name.rsplit(".", 1)[0], self,
+                                        context.scene.neox_share_skeleton, timer, bulk.collection)
+                    imported += 1
+                except Exception as e:
+                    self.report({'WARNING'}, f"{mesh_name} can't be imported: {e}")
+        finally:
+            bulk.finish(context, "Import NeoX Meshes")
+
+        self.report({'INFO'}, f"Imported {imported}/{len(mesh_paths)} meshes → {source}")
+        report_timing(timer, self, context.scene, source=source, meshes=imported)
+        return {'FINISHED'}
+
+
+class IDVMI_OT_Import_Neox_Mesh_Modal(bpy.types.Operator):
+    bl_idname = "idvmi_tools.neox_modal_importer"
+    bl_label = "Import NeoX Meshes in Background"
+
+    # Seconds of object building per timer tick, the UI stays responsive in between
+    time_slice = 0.05
+
+    def execute(self, context):
+        source = bpy.path.abspath(context.scene.neox_batch_selector)
+        mesh_paths = find_mesh_files(source)
+        if not mesh_paths:
+            self.report({'ERROR'}, f"No .mesh files found in {source}")
+            return {'CANCELLED'}
+
+        self._source = source
+        self._total = len(mesh_paths)
+        self._processed = 0
+        self._imported = 0
+        self._steps = None
+        self._share_skeleton = context.scene.neox_share_skeleton
+        self._timer_stages = StageTimer(context.scene.neox_profile_import)
+        # Global undo stays on: the artist keeps working, and undoing, while this runs
+        self._bulk = BulkImport(context, "NeoX Import", context.scene.neox_single_undo, hold_undo=False)
+
+        # Decoding runs on its own thread, objects are built from the timer in modal()
+        self._results = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(
+            target=decode_in_background,
+            args=(mesh_paths, mesh_cache(context.scene), context.scene.neox_lod_level, self._results, self._cancel),
+            daemon=True,
+        )
+        self._thread.start()
+
+        wm = context.window_manager
+        wm.progress_begin(0, self._total)
+        self._timer = wm.event_timer_add(0.1, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.finish(context)
+            self.report({'WARNING'}, f"Import cancelled, {self._imported}/{self._total} meshes imported")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        deadline = time.perf_counter() + self.time_slice
+        while time.perf_counter() < deadline:
+            if self._steps is None:
+                try:
+                    mesh_path, model = self._results.get_nowait()
+                except queue.Empty:
+                    break
+
+                if mesh_path is None:
+                    self.finish(context)
+                    self.report({'INFO'}, f"Imported {self._imported}/{self._total} meshes → {self._source}")
+                    report_timing(self._timer_stages, self, context.scene, source=self._source, meshes=self._imported)
+                    return {'FINISHED'}
+
+                mesh_name = os.path.basename(mesh_path)
+                if isinstance(model, Exception):
+                    self.report({'WARNING'}, f"{mesh_name} can't be decoded: {model}")
+                    self.advance(context)
+                    continue
+
+                with self._timer_stages.stage('validation'):
+                    accepted = check_mesh(model, mesh_name, self)
+                if not accepted:
+                    self.advance(context)
+                else:
+                    self._mesh_name = mesh_name
+                    self._steps = import_steps(model, mesh_name.rsplit(".", 1)[0], self, self._share_skeleton,
+                                               self._timer_stages, self._bulk.collection)
+                continue
+
+            try:
+                next(self._steps)
+            except StopIteration:
+                self._imported += 1
+                self._steps = None
+                self.advance(context)
+            except Exception as e:
+                self.report({'WARNING'}, f"{self._mesh_name} can't be imported: {e}")
+                self._steps = None
+                self.advance(context)
+
+        return {'PASS_THROUGH'}
+
+    def advance(self, context):
+        self._processed += 1
+        context.window_manager.progress_update(self._processed)
+
+    def finish(self, context):
+        """Stop the decoder thread and drop the timer; meshes already built are kept."""
+        self._cancel.set()
+        if self._steps is not None:
+            self._steps.close()
+            self._steps = None
+
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        self._bulk.finish(context, "Import NeoX Meshes")
+
+
+class IDVMI_OT_Add_Neox_Vertex_Groups(bpy.types.Operator):
+    bl_idname = "idvmi_tools.neox_add_vertex_groups"
+    bl_label = "Add All Bone Vertex Groups"
+
+    def execute(self, context):
+        meshes = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if not meshes:
+            self.report({'ERROR'}, "Select the imported NeoX meshes first")
+            return {'CANCELLED'}
+
+        added = 0
+        for mesh_obj in meshes:
+            armature_obj = neox_armature(mesh_obj)
+            if armature_obj is None:
+                self.report({'WARNING'}, f"{mesh_obj.name} isn't bound to a NeoX armature")
+                continue
+            added += add_vertex_groups(mesh_obj, armature_obj['NeoX:BoneOrder'])
+
+        self.report({'INFO'}, f"Added {added} vertex groups to {len(meshes)} meshes")
+        return {'FINISHED'}
+
+
+class BulkImport:
+    """Builds an import in one collection that is linked in at the end, as a single undo step.
+
+    While enabled, the objects sit in a new collection outside the scene until finish()
+    links it under the active collection and pushes one undo step. With `hold_undo`, global
+    undo is also suspended until then, so the many datablocks an import creates don't each
+    get snapshotted; imports that let the user keep working in between leave it alone.
+    Disabled, the active collection is used directly and nothing else changes.
+    """
+
+    # Imports that suspended global undo and haven't given it back yet
+    holding_undo = []
+
+    def __init__(self, context, name: str, enabled: bool, hold_undo: bool = True):
+        self.enabled = enabled
+        self.parent = context.collection
+        self.use_global_undo = None
+        if not enabled:
+            self.collection = context.collection
+            return
+        self.collection = bpy.data.collections.new(name)
+        if hold_undo:
+            self.use_global_undo = context.preferences.edit.use_global_undo
+            context.preferences.edit.use_global_undo = False
+            BulkImport.holding_undo.append(self)
+
+    def release_undo(self, context):
+        """Put global undo back the way it was, if this import suspended it."""
+        if self.use_global_undo is None:
+            return
+        context.preferences.edit.use_global_undo = self.use_global_undo
+        self.use_global_undo = None
+        BulkImport.holding_undo.remove(self)
+
+    def finish(self, context, message: str):
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self.collection.objects:
+            self.parent.children.link(self.collection)
+        else:
+            bpy.data.collections.remove(self.collection)
+        self.release_undo(context)
+        bpy.ops.ed.undo_push(message=message)
+
+
+@persistent
+def release_global_undo(*_):
+    """load_pre handler: an import that never finished must not leave global undo off."""
+    for bulk in list(BulkImport.holding_undo):
+        bulk.release_undo(bpy.context)
+
+
+def decode_in_background(mesh_paths: list[str], cache, lod_level: int, results: queue.Queue, cancel: threading.Event):
+    """Thread target: queue (path, mesh or exception) pairs, then (None, None) once done or cancelled."""
+    decoded = decode_mesh_files(mesh_paths, cache=cache, lod_level=lod_level)
+    try:
+        for result in decoded:
+            if cancel.is_set():
+                break
+            results.put(result)
+    finally:
+        decoded.close()
+        results.put((None, None))
+
+
+def timed_results(results, timer: StageTimer, name: str):
+    """Pass `results` through, timing every wait for the next one as stage `name`."""
+    results = iter(results)
+    while True:
+        with timer.stage(name):
+            try:
+                result = next(results)
+            except StopIteration:
+                return
+        yield result
+
+
+def report_timing(timer: StageTimer, operator, scene, **fields):
+    """Report the stage timings as INFO and append them to the scene's profile log, if one is set."""
+    if not timer.enabled:
+        return
+    print(f"NeoX import stages: {timer}")
+    operator.report({'INFO'}, f"Import stages ({timer.total * 1000:.1f} ms): {timer}")
+    if scene.neox_profile_log.strip():
+        timer.write_log(bpy.path.abspath(scene.neox_profile_log), **fields)
+
+
+def mesh_cache(scene):
+    """The decoded-mesh cache configured on the scene, None when it's switched off."""
+    if not scene.neox_use_cache or not scene.neox_cache_dir.strip():
+        return None
+    return MeshCache(bpy.path.abspath(scene.neox_cache_dir), scene.neox_cache_size * 1024 * 1024)
+
+
+def check_mesh(model, mesh_name: str, operator) -> bool:
+    """Validate a decoded mesh, report what's wrong and tell whether it can be imported."""
+    report = validate_mesh(model)
+    print(f"NeoX mesh validation {mesh_name}: {report}")
+    for issue in report.issues:
+        operator.report({'ERROR' if issue.fatal else 'WARNING'},
+                        f"{mesh_name}: {issue.message} ({issue.count})")
+    return report.accepted
+
+
+def used_joints(joints, bone_count: int) -> list[int]:
+    """Sorted bone indices referenced by a joint array, empty slots and out-of-table joints left out."""
+    joints = np.unique(joints)
+    joints = joints[(joints != np.iinfo(joints.dtype).max) & (joints < bone_count)]
+    return joints.tolist()
+
+
+def neox_armature(mesh_obj):
+    """The NeoX armature a mesh is parented or bound to, None if there isn't one."""
+    candidates = [mesh_obj.parent] + [modifier.object for modifier in mesh_obj.modifiers if modifier.type == 'ARMATURE']
+    for candidate in candidates:
+        if candidate is not None and 'NeoX:BoneOrder' in candidate:
+            return candidate
+    return None
+
+
+def add_vertex_groups(mesh_obj, bone_names) -> int:
+    """Create the missing vertex groups for `bone_names` and return how many were added."""
+    missing = [bone_name for bone_name in bone_names if bone_name not in mesh_obj.vertex_groups]
+    for bone_name in missing:
+        mesh_obj.vertex_groups.new(name=bone_name)
+    return len(missing)
+
+
+def weight_buckets(joints, weights, bone_count: int):
+    """Yield (joint, weight, vertex indices) for every distinct joint/weight pair.
+
+    Empty joint slots (65535, or 255 for uint8 joints) and joints past the bone table are
+    masked out. A joint listed twice on one vertex is summed, the way repeated
+    vertex_group.add(..., 'ADD') calls would.
+    """
+    vertex_count = len(joints)
+    vertex = np.repeat(np.arange(vertex_count, dtype=np.int64), joints.shape[1])
+    joint = joints.ravel().astype(np.int64)
+    weight = weights.ravel()
+
+    keep = (joint != np.iinfo(joints.dtype).max) & (joint < bone_count)
+    vertex, joint, weight = vertex[keep], joint[keep], weight[keep]
+
+    key, inverse = np.unique(joint * vertex_count + vertex, return_inverse=True)
+    weight = np.bincount(inverse, weights=weight, minlength=len(key)).astype(np.float32)
+    joint, vertex = key // vertex_count, key % vertex_count
+
+    order = np.lexsort((vertex, weight, joint))
+    joint, weight, vertex = joint[order], weight[order], vertex[order]
+    starts = np.flatnonzero(np.r_[True, (joint[1:] != joint[:-1]) | (weight[1:] != weight[:-1])])
+    ends = np.r_[starts[1:], len(joint)]
+    for start, end in zip(starts, ends):
+        yield int(joint[start]), float(weight[start]), vertex[start:end].tolist()
+
+
+def build_armature(model, obj_name: str, M_game_to_blender, collection=None):
+    """Create the armature with every bone, parent and tail set in a single edit-mode session.
+
+    Edit mode needs the object in the view layer, so an armature built into a collection
+    outside the scene is also linked to the active one until its bones are done.
+    """
+    collection = collection or bpy.context.collection
     armature_data = bpy.data.armatures.new(obj_name)
     # armature_data.display_type = 'STICK'
 
     armature_obj = bpy.data.objects.new(obj_name, armature_data)
-    bpy.context.collection.objects.link(armature_obj)
+    collection.objects.link(armature_obj)
+    borrowed = armature_obj.name not in bpy.context.view_layer.objects
+    if borrowed:
+        bpy.context.collection.objects.link(armature_obj)
     bpy.context.view_layer.objects.active = armature_obj
 
-    # """ USAGE: bone_index[name] = bone_index """
-    bone_index = {bone_name: bone_index for bone_index, bone_name in enumerate(model['bone_name'])}
-    
-    # """ USAGE: bone_namer[index] = bone_name """
-    bone_namer = {bone_index: bone_name for bone_index, bone_name in enumerate(model['bone_name'])}
-    
-    # """ USAGE: parent_names[index] = parent_name """
-    parent_names = [model['bone_name'][n] if n != -1 else None for n in model['bone_parent']] 
-
-    # -- Bones --
-    def matrix_to_blender(matrix_4):
-        """Convert 4x4 matrix to Blender coordinate system and extract translation"""
-        return (M_game_to_blender @ Matrix(matrix_4.tolist()).transposed()).to_translation()
+    # Heads: translation row of every bone matrix, converted to Blender axes in one go
+    bone_rows = np.array(model['bone_matrix'], dtype=np.float64).reshape(-1, 4, 4)[:, 3, :]
+    heads = (bone_rows @ np.array(M_game_to_blender).T)[:, :3]
+    tail_offset = np.array((0.0, 0.0, 0.1))
 
-    def find_child(bone_name: str):
-        """Find first child of a bone"""
-        try:
-            return parent_names.index(bone_name)
-        except ValueError:
-            return None
-
-    def find_parent(bone_name: str):
-        """Find parent name of a bone"""
-        if bone_name in bone_index:
-            return parent_names[bone_index[bone_name]]
-        return None
+    # """ USAGE: first_child[bone_index] = lowest index among its children """
+    first_child = {}
+    for bone_index, parent_index in enumerate(model['bone_parent']):
+        if parent_index != -1:
+            first_child.setdefault(parent_index, bone_index)
 
     bpy.ops.object.mode_set(mode='EDIT')
 
-    # Create all bones first (heads only)
-    for bone_name, matrix_4 in zip(model['bone_name'], model['bone_matrix']):        
-        bone = armature_obj.data.edit_bones.new(bone_name)
-        bone.head = matrix_to_blender(matrix_4)
-        # Set temporary tail (will be corrected later)
-        bone.tail = bone.head + Vector((0, 0, 0.1))    
+    # Create all bones first, with a temporary tail
+    edit_bones = []
+    for bone_name, head in zip(model['bone_name'], heads):
+        edit_bone = armature_data.edit_bones.new(bone_name)
+        edit_bone.head = head
+        edit_bone.tail = head + tail_offset
+        edit_bones.append(edit_bone)
+
+    # Set parents, and tails to the first child's head (bones without children keep the offset)
+    for bone_index, (edit_bone, parent_index) in enumerate(zip(edit_bones, model['bone_parent'])):
+        if parent_index != -1:
+            edit_bone.parent = edit_bones[parent_index]
+        if bone_index in first_child:
+            edit_bone.tail = heads[first_child[bone_index]]
+
+    bpy.ops.object.mode_set(mode='OBJECT')
+    if borrowed:
+        bpy.context.collection.objects.unlink(armature_obj)
 
-    # Set bone hierarchy and tails
-    for bone_name in model['bone_name']:          
-        edit_bone = armature_obj.data.edit_bones[bone_name]
-        
-        if bone_name == "biped":
-            bpy.ops.object.mode_set(mode='OBJECT')
-            operator.report({'INFO'}, f"{'biped' in armature_obj.data.bones}")
-            bpy.ops.object.mode_set(mode='EDIT')
-            edit_bone = armature_obj.data.edit_bones[bone_name]
-
-        # Set parent
-        parent_name = find_parent(bone_name)
-        if parent_name:
-            edit_bone.parent = armature_obj.data.edit_bones[parent_name]
-        else:
-            edit_bone.parent = None            
-
-        # Set tail to first child's head, or offset from head if no child
-        child_index = find_child(bone_name)
-        if child_index is not None and child_index < len(model['bone_name']):
-            child_name = bone_namer[child_index]
-            if child_name in armature_obj.data.edit_bones:
-                edit_bone.tail = armature_obj.data.edit_bones[child_name].head
-        else:
-            # No child found, set tail to offset from head
-            edit_bone.tail = edit_bone.head + Vector((0, 0, 0.1))
+    return armature_obj
 
-    # bpy.ops.object.mode_set(mode='OBJECT')
 
-    # """ USAGE: armature_bone_index[name] = bone_index """
-    # armature_bone_index = {bone.name: bone_index for bone_index, bone in enumerate(armature_obj.data.bones)}
-    
-    # """ USAGE: armature_bone_namer[index] = bone_name """
-    # armature_bone_namer = {bone_index: bone.name for bone_index, bone in enumerate(armature_obj.data.bones)}
+def find_armature(skeleton_hash: str, collection=None):
+    """An armature in the scene, or in `collection`, built from the skeleton with this fingerprint."""
+    candidates = list(bpy.context.scene.objects)
+    if collection is not None:
+        candidates += collection.objects
+    for obj in candidates:
+        if obj.type == 'ARMATURE' and obj.get('NeoX:SkeletonHash') == skeleton_hash:
+            return obj
+    return None
 
-    # Custom Properties
-    bpy.ops.object.mode_set(mode='POSE')
 
-    
-    for n, pbone in enumerate(armature_obj.pose.bones):
-        if n < len(model['bounding_info']):
-            pbone["NeoX:BoundingInfo"] = model['bounding_info'][n]
+def import_per_material(model, obj_name: str, operator, share_skeleton: bool = False, timer: StageTimer = None,
+                        collection=None):
+    steps = import_steps(model, obj_name, operator, share_skeleton, timer, collection)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
 
-    bpy.ops.object.mode_set(mode='OBJECT')    
 
-    # Set armature custom properties
-    armature_obj['NeoX:BoneOrder'] = model['bone_name']
-    armature_obj['NeoX:BoundingInfo'] = True
-    armature_obj['Neox:BoneMatrix'] = model['bone_matrix']
-    
-    armature_obj['NeoX:BoneTail'] = model['bone_tail']
-    armature_obj['NeoX:LODTable'] = model['lod_data_table']
+def import_steps(model, obj_name: str, operator, share_skeleton: bool = False, timer: StageTimer = None,
+                 collection=None):
+    """Build the armature and submesh objects, yielding after each one so the work can be sliced.
+
+    The armature is the generator's return value. Each stage is timed on `timer` when given,
+    objects go to `collection` (the active one by default).
+    """
+    timer = timer or StageTimer(enabled=False)
+    collection = collection or bpy.context.collection
+
+    # --- Axis conversation ---
+    M_game_to_blender = axis_conversion(
+        from_forward='Z', from_up='Y',   # game 
+        to_forward='-Y',   to_up='Z'      # blender
+    ).to_4x4()    
+
+    # -- Armature --
+    with timer.stage('armature'):
+        skeleton_hash = model.skeleton_hash
+        armature_obj = find_armature(skeleton_hash, collection) if share_skeleton else None
+        if armature_obj is not None:
+            print(f"Reusing armature {armature_obj.name} for {obj_name}")
+        else:
+            armature_obj = build_armature(model, obj_name, M_game_to_blender, collection)
+
+            # Set armature custom properties, the sections written back on export go in one blob
+            armature_obj['NeoX:SkeletonHash'] = skeleton_hash
+            armature_obj['NeoX:BoneOrder'] = model['bone_name']
+            armature_obj['NeoX:Metadata'] = RoundTripMetadata.from_mesh(model).pack()
+            # the submeshes the LOD table describes, meshes sharing the armature come after them
+            armature_obj['NeoX:SubmeshCount'] = len(model['mesh'])
+
+    # """ USAGE: bone_namer[index] = bone_name """
+    bone_namer = {bone_index: bone_name for bone_index, bone_name in enumerate(model['bone_name'])}
+    yield armature_obj
 
     # Convert matrix for 3D operations
     _3D_Matrix = M_game_to_blender.to_3x3()
-    
+
+    # Axis conversion for every vertex at once (row vectors, so multiply by the transpose)
+    with timer.stage('geometry'):
+        axis_matrix = np.array(_3D_Matrix, dtype=np.float32).T
+        positions = np.ascontiguousarray(model['position'] @ axis_matrix, dtype=np.float32)
+        normals = np.ascontiguousarray(model['normal'] @ axis_matrix, dtype=np.float32)
+
     # Meshes
     current_vertex_index = 0
     current_face_index = 0
     
-    for mesh_index, mesh_info in enumerate(model['mesh']):
+    for mesh_index, mesh_info in zip(model['submesh_index'], model['mesh']):
         mesh_vertex_count, mesh_face_count, uv_ch_count, has_color = mesh_info
+        vertex_slice = slice(current_vertex_index, current_vertex_index + mesh_vertex_count)
 
-        mesh_data = bpy.data.meshes.new(f"{obj_name}_{mesh_index}")
-        mesh_obj = bpy.data.objects.new(f"{obj_name}_{mesh_index}", mesh_data)
-        bpy.context.collection.objects.link(mesh_obj)
-    
-        # Position & Normal - FIX: Convert tuples to Vector properly
-        vertices = []
-        normals = []
-        
-        for vertex_index in range(current_vertex_index, current_vertex_index + mesh_vertex_count):
-            # Convert position and normal to Vectors, then apply transformation
-            pos_vector = Vector(model['position'][vertex_index])
-            norm_vector = Vector(model['normal'][vertex_index])
-            
-            vertices.append((_3D_Matrix @ pos_vector)[:])  # Convert back to tuple
-            normals.append((_3D_Matrix @ norm_vector)[:])   # Convert back to tuple
+        with timer.stage('geometry'):
+            mesh_data = bpy.data.meshes.new(f"{obj_name}_{mesh_index}")
+            mesh_obj = bpy.data.objects.new(f"{obj_name}_{mesh_index}", mesh_data)
+            collection.objects.link(mesh_obj)
 
-        # Faces - FIX: Adjust face indices to be relative to current mesh
-        faces = []
-        for face_index in range(current_face_index, current_face_index + mesh_face_count):
-            # Adjust face indices to be relative to current mesh vertices
-            original_face = model['face'][face_index]
-            adjusted_face = [idx - current_vertex_index for idx in original_face]
-            faces.append(adjusted_face)
+            # Faces, relative to this mesh's vertices
+            faces = model['face'][current_face_index:current_face_index + mesh_face_count].astype(np.int32)
+            faces -= current_vertex_index
 
-        current_face_index += mesh_face_count
+            current_face_index += mesh_face_count
+
+            # Create mesh geometry straight from the flat buffers
+            mesh_data.vertices.add(mesh_vertex_count)
+            mesh_data.vertices.foreach_set("co", positions[vertex_slice].ravel())
+
+            mesh_data.loops.add(mesh_face_count * 3)
+            mesh_data.loops.foreach_set("vertex_index", faces.ravel())
+
+            mesh_data.polygons.add(mesh_face_count)
+            mesh_data.polygons.foreach_set("loop_start", np.arange(0, mesh_face_count * 3, 3, dtype=np.int32))
+            mesh_data.polygons.foreach_set("loop_total", np.full(mesh_face_count, 3, dtype=np.int32))
+
+            mesh_data.update(calc_edges=True)
 
-        # Create mesh geometry
-        mesh_data.from_pydata(vertices, [], faces)
-        
         # FIX: Set custom normals properly
-        mesh_data.use_auto_smooth = True
-        # mesh_data.auto_smooth_angle = 3.14159  # 180 degrees
-        mesh_data.auto_smooth_angle = pi  # 180 degrees
-        
-        mesh_data.calc_loop_triangles()
-        mesh_data.calc_normals_split()
-        mesh_data.normals_split_custom_set_from_vertices(normals)
-        mesh_data.update()
+        with timer.stage('normals'):
+            mesh_data.use_auto_smooth = True
+            # mesh_data.auto_smooth_angle = 3.14159  # 180 degrees
+            mesh_data.auto_smooth_angle = pi  # 180 degrees
+
+            mesh_data.calc_loop_triangles()
+            mesh_data.calc_normals_split()
+            mesh_data.normals_split_custom_set_from_vertices(normals[vertex_slice])
+            mesh_data.update()
 
         # UV Mapping - FIX: Proper UV assignment
-        if 'uv' in model and model['uv']:
-            if not mesh_obj.data.uv_layers:
-                mesh_obj.data.uv_layers.new()
-
-            uv_layer = mesh_obj.data.uv_layers.active.data
-
-            # Map vertex UVs to loops (face corners)
-            for face in mesh_data.polygons:
-                for loop_idx in face.loop_indices:
-                    vertex_idx = mesh_data.loops[loop_idx].vertex_index
-                    global_vertex_idx = current_vertex_index + vertex_idx
-                    
-                    if global_vertex_idx < len(model['uv']):
-                        # uv_layer[loop_idx].uv = model['uv'][global_vertex_idx]
-                        u, v = model['uv'][global_vertex_idx]
-                        uv_layer[loop_idx].uv = (u, 1.0 - v)
-
-        # Create Vertex Groups for all bones
-        for bone_name in model['bone_name']:
-            if bone_name not in mesh_obj.vertex_groups:
-                mesh_obj.vertex_groups.new(name=bone_name)
-
-        # FIX: Assign vertex weights properly
-        # Process only vertices belonging to this mesh
-        mesh_vertex_data = model['vertex_bone'][current_vertex_index:current_vertex_index + mesh_vertex_count]
-        mesh_weight_data = model['vertex_weight'][current_vertex_index:current_vertex_index + mesh_vertex_count]
-        
-        for local_vertex_index, (joints, weights) in enumerate(zip(mesh_vertex_data, mesh_weight_data)):
-            """
-            joint => uint16(4)
-            weight => float(4)
-            """
-            for joint, weight in zip(joints, weights):
-                # Skip invalid joints (65535 = -1 as uint16)
-                if joint == 65535 or joint == 255:
-                    continue
-                    
-                group_name = bone_namer[joint]
-                
-                vertex_group = mesh_obj.vertex_groups[group_name]                   
-                vertex_group.add([local_vertex_index], weight, 'ADD')
+        if 'uv' in model and len(model['uv']):
+            with timer.stage('uvs'):
+                if not mesh_obj.data.uv_layers:
+                    mesh_obj.data.uv_layers.new()
+
+                uv_layer = mesh_obj.data.uv_layers.active.data
+
+                # Map vertex UVs to loops (face corners) with one gather, V flipped
+                loop_vertices = np.empty(len(mesh_data.loops), dtype=np.int32)
+                mesh_data.loops.foreach_get("vertex_index", loop_vertices)
+                loop_uv = np.take(model['uv'][vertex_slice], loop_vertices, axis=0).astype(np.float32)
+                loop_uv[:, 1] = 1.0 - loop_uv[:, 1]
+                uv_layer.foreach_set("uv", loop_uv.ravel())
+
+        with timer.stage('vertex groups'):
+            # Create Vertex Groups only for the bones this mesh is skinned to, in bone order
+            # (the rest can be added later with "Add All Bone Vertex Groups")
+            mesh_joints = model['vertex_bone'][vertex_slice]
+            for joint in used_joints(mesh_joints, len(model['bone_name'])):
+                mesh_obj.vertex_groups.new(name=bone_namer[joint])
+
+            # Assign vertex weights, one add() per (bone, weight) bucket
+            # Process only vertices belonging to this mesh
+            buckets = weight_buckets(mesh_joints, model['vertex_weight'][vertex_slice], len(model['bone_name']))
+            for joint, weight, vertex_indices in buckets:
+                mesh_obj.vertex_groups[bone_namer[joint]].add(vertex_indices, weight, 'ADD')
 
         current_vertex_index += mesh_vertex_count
 
         # --- 3) ARMATURE_AUTO YOK. Sadece modifier + parent ekle ---
-        modifier = mesh_obj.modifiers.new(name="Armature", type='ARMATURE')
-        modifier.object = armature_obj
-        modifier.use_vertex_groups = True
-        modifier.use_bone_envelopes = False
+        with timer.stage('modifiers'):
+            modifier = mesh_obj.modifiers.new(name="Armature", type='ARMATURE')
+            modifier.object = armature_obj
+            modifier.use_vertex_groups = True
+            modifier.use_bone_envelopes = False
 
-        mesh_obj.parent = armature_obj  # opsiyonel, sadece hiyerarşi için
+            mesh_obj.parent = armature_obj  # opsiyonel, sadece hiyerarşi için
+        yield mesh_obj
 
     print(f"Successfully imported model: {obj_name}")
     return armature_obj
-
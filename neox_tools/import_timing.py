@@ -0,0 +1,51 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Wall time and allocated-block deltas of each import stage.
+
+    Blocks come from sys.getallocatedblocks(), so they count Python objects (RNA
+    wrappers, lists, tuples) but not numpy array buffers. A stage entered several
+    times, once per submesh for example, accumulates. A disabled timer measures
+    nothing, its stages cost a context manager each.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages = {}  # name -> [seconds, blocks]
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, [0.0, 0])
+            entry[0] += time.perf_counter() - start
+            entry[1] += sys.getallocatedblocks() - blocks
+
+    @property
+    def total(self) -> float:
+        return sum(seconds for seconds, _ in self.stages.values())
+
+    def to_dict(self) -> dict:
+        return {name: {'seconds': round(seconds, 6), 'blocks': blocks}
+                for name, (seconds, blocks) in self.stages.items()}
+
+    def write_log(self, log_path: str, **fields):
+        """Append the stages as one JSON line, with `fields` (mesh path, counts...) alongside."""
+        record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), **fields,
+                  'total_seconds': round(self.total, 6), 'stages': self.to_dict()}
+        with open(log_path, "a", encoding="utf-8") as log_file:
+            log_file.write(json.dumps(record) + "\n")
+
+    def __str__(self) -> str:
+        return ", ".join(f"{name} {seconds * 1000:.1f} ms ({blocks:+d} blocks)"
+                         for name, (seconds, blocks) in self.stages.items())
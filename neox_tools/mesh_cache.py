@@ -0,0 +1,126 @@
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from .neox_mesh import NeoXMesh
+from .neox_mesh_parser import PARSER_VERSION
+
+
+def pack_mesh(mesh: NeoXMesh) -> dict[str, np.ndarray]:
+    """Flatten a NeoXMesh into plain arrays that np.savez can store without pickling."""
+    arrays = {}
+    for key in mesh.keys():
+        value = mesh[key]
+        if isinstance(value, bytes):
+            arrays[key] = np.frombuffer(value, dtype=np.uint8)
+        elif key == 'bone_name':
+            arrays[key] = np.array(value, dtype=str)
+        elif key == 'mesh':
+            arrays[key] = np.array(value, dtype=np.int64).reshape(-1, 4)
+        else:
+            arrays[key] = np.asarray(value)
+    return arrays
+
+
+def unpack_mesh(arrays) -> NeoXMesh:
+    """Inverse of pack_mesh(), giving back the same types the parsers produce."""
+    mesh = NeoXMesh()
+    for key in arrays.files if hasattr(arrays, 'files') else arrays:
+        value = arrays[key]
+        if key in ('bone_tail', 'lod_data_table'):
+            mesh[key] = value.tobytes()
+        elif key in ('mesh_version', 'bone_count', 'bone_exist'):
+            mesh[key] = int(value)
+        elif key == 'mesh':
+            mesh[key] = [tuple(entry) for entry in value.tolist()]
+        elif key == 'bounding_info':
+            mesh[key] = [tuple(info) for info in value.tolist()]
+        elif key == 'bone_matrix':
+            mesh[key] = list(value)
+        elif key in ('bone_parent', 'bone_name', 'vertex_color'):
+            mesh[key] = value.tolist()
+        else:
+            mesh[key] = value
+    mesh.index_submeshes()
+    return mesh
+
+
+class MeshCache:
+    """Decoded meshes stored as .npz files keyed by file content and parser version.
+
+    Entries are addressed by a content key from file_key() or data_key(), computed
+    once by the caller and passed to load() and store(). Least recently used entries
+    are evicted once the folder grows past `max_bytes`, a hit counts as a use by
+    bumping the entry's mtime.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def file_key(mesh_path: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(mesh_path, "rb") as mesh_file:
+            for chunk in iter(lambda: mesh_file.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def data_key(data: bytes) -> str:
+        """file_key() of a file already read into memory."""
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}-v{PARSER_VERSION}.npz")
+
+    def contains(self, key: str) -> bool:
+        return os.path.isfile(self.entry_path(key))
+
+    def load(self, key: str) -> Optional[NeoXMesh]:
+        entry_path = self.entry_path(key)
+        if not os.path.isfile(entry_path):
+            return None
+        try:
+            with np.load(entry_path, allow_pickle=False) as arrays:
+                mesh = unpack_mesh(arrays)
+        except Exception as e:
+            print(f"Dropping broken cache entry {entry_path}: {e}")
+            os.remove(entry_path)
+            return None
+        os.utime(entry_path)
+        return mesh
+
+    def store(self, key: str, mesh: NeoXMesh):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self.entry_path(key)
+        # write next to the entry and rename, so readers never see half a file
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as entry_file:
+                np.savez(entry_file, **pack_mesh(mesh))
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,137 @@
+import hashlib
+import struct
+import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass
+class LODTable:
+    """The table at `table_offset`: a block header followed by (lod level, first submesh) pairs.
+
+    A level covers the submeshes from its first one up to the next level's first one.
+    """
+    block_count: int
+    block_infos: int
+    pairs: list[tuple[int, int]]
+
+    @classmethod
+    def decode(cls, data: bytes) -> 'LODTable':
+        if len(data) < 8:
+            return cls(0, 0, [])
+        block_count, block_infos, pair_count = struct.unpack_from('<HIH', data)
+        pair_count = min(pair_count, (len(data) - 8) // 8)
+        pairs = [struct.unpack_from('<II', data, 8 + n * 8) for n in range(pair_count)]
+        return cls(block_count, block_infos, pairs)
+
+    def encode(self) -> bytes:
+        return struct.pack('<HIH', self.block_count, self.block_infos, len(self.pairs)) + \
+            b"".join(struct.pack('<II', lod, first) for lod, first in self.pairs)
+
+    def levels(self, submesh_count: int) -> dict[int, list[int]]:
+        """Submesh indices of every LOD level.
+
+        A table that doesn't start at submesh 0 can't describe the submeshes, then they
+        all count as LOD 0.
+        """
+        starts = sorted((first, lod) for lod, first in self.pairs if first < submesh_count)
+        if not starts or starts[0][0] != 0:
+            return {0: list(range(submesh_count))}
+
+        levels = {}
+        for n, (first, lod) in enumerate(starts):
+            end = starts[n + 1][0] if n + 1 < len(starts) else submesh_count
+            levels.setdefault(lod, []).extend(range(first, end))
+        return levels
+
+
+class NeoXMesh:
+    """Decoded .mesh file held as contiguous numpy arrays.
+
+    Parsers fill it through the same item access they use on a plain dict, so
+    `model['position']`, `'uv' in model` and friends keep working. Keys that were
+    never set raise KeyError just like a dict would.
+    """
+
+    FIELDS = (
+        'mesh_version', 'bone_count', 'bone_exist',
+        'bone_parent', 'bone_name', 'bounding_info', 'bone_matrix',
+        'mesh', 'position', 'normal', 'tangent', 'face', 'uv', 'vertex_color',
+        'vertex_bone', 'vertex_weight', 'bone_tail', 'lod_data_table', 'submesh_index',
+    )
+
+    __slots__ = FIELDS + ('vertex_offset', 'vertex_count', 'face_offset', 'face_count')
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS and hasattr(self, key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> list[str]:
+        return [key for key in self.FIELDS if hasattr(self, key)]
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self.keys()}
+
+    @classmethod
+    def from_dict(cls, model: dict) -> 'NeoXMesh':
+        mesh = cls()
+        for key, value in model.items():
+            mesh[key] = value
+        mesh.index_submeshes()
+        return mesh
+
+    def index_submeshes(self):
+        """Fill the per-submesh vertex/face offset and count arrays from `mesh`."""
+        if not hasattr(self, 'submesh_index'):
+            self.submesh_index = np.arange(len(self.mesh))
+        counts = np.array([entry[:2] for entry in self.mesh], dtype=np.int64).reshape(-1, 2)
+        self.vertex_count = counts[:, 0]
+        self.face_count = counts[:, 1]
+        self.vertex_offset = np.cumsum(self.vertex_count) - self.vertex_count
+        self.face_offset = np.cumsum(self.face_count) - self.face_count
+
+    def vertex_range(self, mesh_index: int) -> slice:
+        start = int(self.vertex_offset[mesh_index])
+        return slice(start, start + int(self.vertex_count[mesh_index]))
+
+    def face_range(self, mesh_index: int) -> slice:
+        start = int(self.face_offset[mesh_index])
+        return slice(start, start + int(self.face_count[mesh_index]))
+
+    @property
+    def lod_table(self) -> LODTable:
+        return LODTable.decode(self.lod_data_table)
+
+    @property
+    def skeleton_hash(self) -> str:
+        """Fingerprint of bone names, parents, matrices and bounding info, equal for meshes sharing a skeleton."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update('\0'.join(self.bone_name).encode('utf-8'))
+        digest.update(np.asarray(self.bone_parent, dtype=np.int32).tobytes())
+        digest.update(np.asarray(self.bone_matrix, dtype=np.float32).tobytes())
+        bounding_info = self.get('bounding_info')
+        if bounding_info is not None:
+            digest.update(np.asarray(bounding_info, dtype=np.float32).tobytes())
+        return digest.hexdigest()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the vertex and face arrays."""
+        return sum(value.nbytes for value in (self.get(key) for key in self.FIELDS) if isinstance(value, np.ndarray))
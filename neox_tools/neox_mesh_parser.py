@@ -1,6 +1,13 @@
+import mmap
+import os
 import struct
 import numpy as np
+from dataclasses import dataclass
 from typing import Any, BinaryIO
+from .neox_mesh import LODTable, NeoXMesh
+
+# Bump whenever decoded output changes, it invalidates the on-disk mesh cache
+PARSER_VERSION = 2
 
 def readuint8(f):
     return int(struct.unpack('B', f.read(1))[0])
@@ -17,6 +24,466 @@ def readuint32(f):
 def readfloat(f):
     return struct.unpack('<f', f.read(4))[0]
 
+
+def read_array(f, dtype, count: int, width: int = 1) -> np.ndarray:
+    """Read `count` rows of `width` values with one read and view them as a numpy array.
+
+    On a memory map the array is a read-only view into the mapping and nothing is copied.
+    """
+    dtype = np.dtype(dtype)
+    size = count * width * dtype.itemsize
+    if isinstance(f, mmap.mmap):
+        offset = f.tell()
+        if offset + size > len(f):
+            raise ValueError(f"Unexpected end of file, wanted {size} bytes at position {offset}")
+        array = np.frombuffer(f, dtype=dtype, count=count * width, offset=offset)
+        f.seek(size, 1)
+    else:
+        data = f.read(size)
+        if len(data) != size:
+            raise ValueError(f"Unexpected end of file, wanted {size} bytes at position {f.tell() - len(data)}")
+        array = np.frombuffer(data, dtype=dtype)
+    return array.reshape(count, width) if width > 1 else array
+
+
+def read_bone_parents(f, bone_count: int, dtype) -> list[int]:
+    parents = read_array(f, dtype, bone_count).astype(np.int64)
+    parents[parents == np.iinfo(dtype).max] = -1
+    return parents.tolist()
+
+
+def read_bone_names(f, bone_count: int) -> list[str]:
+    return [f.read(32).decode().replace('\0', '') for _ in range(bone_count)]
+
+
+def read_bounding_info(f, bone_count: int) -> list[tuple]:
+    return [tuple(info) for info in read_array(f, '<f4', bone_count, 7).tolist()]
+
+
+def read_bone_matrices(f, bone_count: int) -> list[np.ndarray]:
+    matrices = read_array(f, '<f4', bone_count, 16).astype(np.float64)
+    return list(matrices.reshape(bone_count, 4, 4))
+
+
+def read_uv(f, meshes) -> np.ndarray:
+    """First UV layer of every submesh, zero filled for submeshes without one."""
+    if meshes and all(uv_layers == 1 for _, _, uv_layers, _ in meshes):
+        # single layer everywhere -> the section is one contiguous block
+        return read_array(f, '<f4', sum(mesh[0] for mesh in meshes), 2)
+
+    uv = []
+    for mesh_vertex_count, _, uv_layers, _ in meshes:
+        if uv_layers > 0:
+            uv.append(read_array(f, '<f4', mesh_vertex_count, 2))
+            f.seek(mesh_vertex_count * 8 * (uv_layers - 1), 1)
+        else:
+            uv.append(np.zeros((mesh_vertex_count, 2), dtype=np.float32))
+    if not uv:
+        return np.zeros((0, 2), dtype=np.float32)
+    return np.concatenate(uv)
+
+
+@dataclass(frozen=True)
+class MeshFormat:
+    """Header fingerprint of a .mesh file and the one parser that decodes it."""
+    magic: bytes
+    mesh_version: int
+    bone_exist: int
+    bone_count: int
+    index_width: int  # byte width of bone parents and vertex joints
+    has_bounding_info: bool
+    table_offset: int
+    parser_name: str
+
+    @property
+    def parser(self):
+        return PARSERS[self.parser_name]
+
+    def __str__(self) -> str:
+        return (f"magic={self.magic.hex()} version={self.mesh_version} bone_exist={self.bone_exist} "
+                f"bones={self.bone_count} index=uint{self.index_width * 8} "
+                f"bounding={'yes' if self.has_bounding_info else 'no'} -> {self.parser_name}")
+
+
+def is_bone_name(name: bytes) -> bool:
+    """The bytes before the first NUL decode as UTF-8, an empty name is fine too."""
+    try:
+        name.split(b'\0', 1)[0].decode()
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def bone_table_fits(f, offset: int, bone_count: int, index_width: int, file_size: int) -> bool:
+    """Whether parents of `index_width` bytes followed by 32 byte names make sense at `offset`.
+
+    Names alone rarely rule a width out, so the bounding info flag, the matrices, the
+    has_binding_info byte and the table offset after them must line up as well.
+    """
+    f.seek(offset)
+    data = f.read(bone_count * (index_width + 32))
+    if len(data) != bone_count * (index_width + 32):
+        return False
+
+    dtype = np.dtype('<u2' if index_width == 2 else 'u1')
+    parents = np.frombuffer(data, dtype=dtype, count=bone_count)
+    if not ((parents < bone_count) | (parents == np.iinfo(dtype).max)).all():
+        return False
+
+    names = data[bone_count * index_width:]
+    if not all(is_bone_name(names[n:n + 32]) for n in range(0, len(names), 32)):
+        return False
+
+    has_bounding_info = f.read(1)
+    if not has_bounding_info:
+        return False
+    f.seek(bone_count * ((28 if has_bounding_info[0] else 0) + 64), 1)
+    data = f.read(5)
+    return len(data) == 5 and data[0] == 0 and f.tell() < struct.unpack_from('<I', data, 1)[0] <= file_size
+
+
+def probe_mesh_format(f: BinaryIO) -> MeshFormat:
+    """Sniff the header and pick the parser for it without decoding any vertex data.
+
+    When the header can't be told apart, every parser is tried in turn like imports did
+    before the probe existed, and the first one that decodes the file is picked.
+    """
+    try:
+        return sniff_mesh_format(f)
+    except ValueError:
+        mesh_format = trial_mesh_format(f)
+        if mesh_format is None:
+            raise
+        return mesh_format
+
+
+def trial_mesh_format(f: BinaryIO):
+    """MeshFormat of the first parser, in PARSERS order, that decodes `f`; None if none does."""
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    for parser_name, parser in PARSERS.items():
+        f.seek(0)
+        try:
+            model = parser(NeoXMesh(), f, None)
+        except Exception:
+            continue
+
+        f.seek(0)
+        header = f.read(12)
+        bone_count = 0
+        if model['bone_exist']:
+            if model['bone_exist'] > 1:
+                count = readuint8(f)
+                f.seek(2 + count * 4, 1)
+            bone_count = readuint16(f)
+        f.seek(0)
+        return MeshFormat(header[:4], header[4], model['bone_exist'], bone_count,
+                          1 if parser_name == 'parse_mesh_3' else 2, 'bounding_info' in model,
+                          file_size - len(model['lod_data_table']), parser_name)
+    f.seek(0)
+    return None
+
+
+def sniff_mesh_format(f: BinaryIO) -> MeshFormat:
+    """probe_mesh_format() from the header alone, ValueError when it doesn't add up."""
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    f.seek(0)
+
+    header = f.read(12)
+    if len(header) != 12:
+        raise ValueError(f"File is too small to be a NeoX mesh ({file_size} bytes)")
+    magic = header[:4]
+    mesh_version = header[4]
+    bone_exist = struct.unpack_from('<I', header, 8)[0]
+
+    bone_count = 0
+    index_width = 2
+    has_bounding_info = False
+
+    if bone_exist:
+        if bone_exist > 1:
+            count = readuint8(f)
+            f.seek(2 + count * 4, 1)
+        bone_count = readuint16(f)
+        bone_table = f.tell()
+
+        # uint16 parents first, a uint8 table read as uint16 swallows the names and fails
+        for index_width in (2, 1):
+            if bone_table_fits(f, bone_table, bone_count, index_width, file_size):
+                break
+        else:
+            raise ValueError(f"Unrecognised bone table at position {bone_table}")
+
+        f.seek(bone_table + bone_count * (index_width + 32))
+        has_bounding_info = readuint8(f) != 0
+        f.seek(bone_count * ((28 if has_bounding_info else 0) + 64), 1)
+
+        has_binding_info = readuint8(f)
+        if has_binding_info != 0:
+            raise ValueError(f"Unexpected has_binding_info value {has_binding_info} at position {f.tell()}")
+        parser_name = 'parse_mesh_1' if index_width == 2 else 'parse_mesh_3'
+    else:
+        # parse_mesh_1 expects a has_binding_info byte before the table offset, parse_mesh_2 doesn't
+        position = f.tell()
+        data = f.read(5)
+        if len(data) == 5 and data[0] == 0 and position + 5 < struct.unpack_from('<I', data, 1)[0] <= file_size:
+            parser_name = 'parse_mesh_1'
+            f.seek(position + 1)
+        else:
+            parser_name = 'parse_mesh_2'
+            f.seek(position)
+
+    table_offset = readuint32(f)
+    if not f.tell() < table_offset <= file_size:
+        raise ValueError(f"Table offset {table_offset} is outside of the file ({file_size} bytes)")
+
+    f.seek(0)
+    return MeshFormat(magic, mesh_version, bone_exist, bone_count, index_width,
+                      has_bounding_info, table_offset, parser_name)
+
+
+_format_cache: dict[tuple, MeshFormat] = {}
+
+
+def probe_mesh_file(mesh_path: os.PathLike) -> MeshFormat:
+    """probe_mesh_format() for a path, remembered until the file changes on disk."""
+    stat = os.stat(mesh_path)
+    key = (os.path.abspath(mesh_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _format_cache:
+        with open(mesh_path, "rb") as mesh_file:
+            _format_cache[key] = probe_mesh_format(mesh_file)
+    return _format_cache[key]
+
+
+def decode_mesh(f: BinaryIO, mesh_format: MeshFormat = None, operator=None) -> NeoXMesh:
+    """Decode `f` into a NeoXMesh with the parser its header asks for."""
+    if mesh_format is None:
+        mesh_format = probe_mesh_format(f)
+    f.seek(0)
+    mesh = mesh_format.parser(NeoXMesh(), f, operator)
+    mesh.index_submeshes()
+    return mesh
+
+
+def decode_lod(f: BinaryIO, lod_level: int, mesh_format: MeshFormat = None, operator=None) -> NeoXMesh:
+    """Decode only the submeshes that belong to `lod_level`, other levels are never read.
+
+    The mesh's LOD table is rewritten to list that level alone, starting at its first
+    submesh, so exporting it doesn't point at submeshes that were left out.
+    """
+    if mesh_format is None:
+        mesh_format = probe_mesh_format(f)
+    f.seek(mesh_format.table_offset)
+    table = f.read()
+    lod_table = LODTable.decode(table)
+
+    header = NeoXMesh()
+    read_mesh_header(header, f, mesh_format)
+    levels = lod_table.levels(len(header['mesh']))
+    if lod_level not in levels:
+        raise ValueError(f"LOD {lod_level} isn't in the file, it has LOD {sorted(levels)}")
+
+    mesh = decode_submeshes(f, levels[lod_level], None, mesh_format, operator)
+    if len(levels) > 1:
+        # bytes after the pairs are kept as they were
+        level_table = LODTable(lod_table.block_count, lod_table.block_infos, [(lod_level, 0)])
+        mesh['lod_data_table'] = level_table.encode() + table[8 + len(lod_table.pairs) * 8:]
+    return mesh
+
+
+def parse_mesh_mapped(mesh_path: os.PathLike, mesh_format: MeshFormat = None, operator=None) -> NeoXMesh:
+    """Decode a .mesh file from a read-only memory map instead of reading it.
+
+    Vertex sections come back as numpy views into the mapping, so pages are only
+    loaded when the arrays are touched. The mapping is released once the last
+    view is dropped, which keeps batch scans at header-sized memory per file.
+    """
+    with open(mesh_path, "rb") as mesh_file:
+        mapped = mmap.mmap(mesh_file.fileno(), 0, access=mmap.ACCESS_READ)
+    return decode_mesh(mapped, mesh_format, operator)
+
+MESH_ATTRIBUTES = ('position', 'normal', 'tangent', 'face', 'uv', 'vertex_bone', 'vertex_weight')
+
+
+def read_mesh_header(model, f: BinaryIO, mesh_format: MeshFormat) -> tuple[int, int, int]:
+    """Decode bones and the submesh table the way `mesh_format.parser` would.
+
+    Leaves `f` at the start of the vertex positions and returns
+    (table_offset, vertex_count, face_count).
+    """
+    f.seek(8)
+    model['mesh_version'] = mesh_format.mesh_version
+    model['bone_exist'] = readuint32(f)
+    model['mesh'] = []
+
+    if model['bone_exist']:
+        if model['bone_exist'] > 1:
+            count = readuint8(f)
+            f.read(2)
+            f.read(count * 4)
+        bone_count = readuint16(f)
+        parent_nodes = read_bone_parents(f, bone_count, '<u2' if mesh_format.index_width == 2 else 'u1')
+        model['bone_parent'] = parent_nodes
+        model['bone_name'] = read_bone_names(f, bone_count)
+
+        bone_binding_info = readuint8(f)
+        if bone_binding_info:
+            model['bounding_info'] = read_bounding_info(f, bone_count)
+
+        model['bone_matrix'] = read_bone_matrices(f, bone_count)
+
+        if len(list(filter(lambda x: x == -1, parent_nodes))) > 1:
+            num = len(model['bone_parent'])
+            model['bone_parent'] = list(map(lambda x: num if x == -1 else x, model['bone_parent']))
+            model['bone_parent'].append(-1)
+            model['bone_name'].append('dummy_root')
+            model['bone_matrix'].append(np.identity(4))
+
+    if model['bone_exist'] or mesh_format.parser_name == 'parse_mesh_1':
+        has_binding_info = readuint8(f)
+        if has_binding_info != 0:
+            raise ValueError(f"Unexpected has_binding_info value {has_binding_info} at position {f.tell()}")
+
+    table_offset = readuint32(f)
+    while True:
+        lod_new_v = readuint16(f)
+        if lod_new_v == 1:
+            break
+        f.seek(-2, 1)
+        mesh_vertex_count = readuint32(f)
+        mesh_face_count = readuint32(f)
+        uv_layers = readuint8(f)
+        color_len = readuint8(f)
+
+        model['mesh'].append((mesh_vertex_count, mesh_face_count, uv_layers, color_len))
+
+    vertex_count = readuint32(f)
+    face_count = readuint32(f)
+    return table_offset, vertex_count, face_count
+
+
+def mesh_section_layout(f: BinaryIO, meshes, vertex_count: int, face_count: int, index_width: int,
+                        bone_exist: int) -> dict[str, Any]:
+    """Byte offsets of every vertex section, starting from the positions at `f.tell()`.
+
+    'uv' and 'vertex_color' are per-submesh offset arrays, the rest are single offsets.
+    The tangent section is None when the file has no tangents.
+    """
+    position = f.tell()
+    normal = position + vertex_count * 12
+    f.seek(normal + vertex_count * 12)
+    has_tangent = readuint16(f)
+    tangent = f.tell() if has_tangent else None
+    face = f.tell() + (vertex_count * 12 if has_tangent else 0)
+
+    counts = np.array([mesh[:4] for mesh in meshes], dtype=np.int64).reshape(-1, 4)
+    uv_sizes = counts[:, 0] * 8 * counts[:, 2]
+    color_sizes = counts[:, 0] * 4 * counts[:, 3]
+    uv_start = face + face_count * 6
+    color_start = uv_start + int(uv_sizes.sum())
+    vertex_bone = color_start + int(color_sizes.sum())
+    vertex_weight = vertex_bone + vertex_count * 4 * index_width
+    bone_tail = vertex_weight + vertex_count * 16 if bone_exist else vertex_bone
+
+    return {
+        'position': position,
+        'normal': normal,
+        'tangent': tangent,
+        'face': face,
+        'uv': uv_start + np.cumsum(uv_sizes) - uv_sizes,
+        'vertex_color': color_start + np.cumsum(color_sizes) - color_sizes,
+        'vertex_bone': vertex_bone if bone_exist else None,
+        'vertex_weight': vertex_weight if bone_exist else None,
+        'bone_tail': bone_tail,
+    }
+
+
+def decode_submeshes(f: BinaryIO, submeshes=None, attributes=None, mesh_format: MeshFormat = None,
+                     operator=None) -> NeoXMesh:
+    """Decode only the given submesh indices and attribute names, seeking straight to their bytes.
+
+    Bones, the submesh table and the footer are always decoded. The result lists only the
+    selected submeshes, in file order, with face indices rebased onto the selected vertices,
+    and `submesh_index` keeps their original indices.
+    """
+    if mesh_format is None:
+        mesh_format = probe_mesh_format(f)
+    attributes = set(MESH_ATTRIBUTES if attributes is None else attributes)
+    unknown = attributes.difference(MESH_ATTRIBUTES)
+    if unknown:
+        raise ValueError(f"Unknown mesh attributes {sorted(unknown)}")
+
+    model = NeoXMesh()
+    table_offset, vertex_count, face_count = read_mesh_header(model, f, mesh_format)
+    layout = mesh_section_layout(f, model['mesh'], vertex_count, face_count, mesh_format.index_width,
+                                 model['bone_exist'])
+
+    all_meshes = model['mesh']
+    selected = range(len(all_meshes)) if submeshes is None else sorted(set(submeshes))
+    for mesh_index in selected:
+        if not 0 <= mesh_index < len(all_meshes):
+            raise IndexError(f"Submesh {mesh_index} out of range, the file has {len(all_meshes)}")
+
+    model.index_submeshes()
+    vertex_offset, face_offset = model.vertex_offset, model.face_offset
+
+    joint_dtype = '<u2' if mesh_format.index_width == 2 else 'u1'
+    sections = {
+        'position': ('<f4', 12, 3),
+        'normal': ('<f4', 12, 3),
+        'tangent': ('<f4', 12, 3),
+        'vertex_bone': (joint_dtype, 4 * mesh_format.index_width, 4),
+        'vertex_weight': ('<f4', 16, 4),
+    }
+    decoded = {key: [] for key in attributes if layout[key] is not None or key == 'uv'}
+    new_vertex_offset = 0
+    for mesh_index in selected:
+        mesh_vertex_count, mesh_face_count, uv_layers, _ = all_meshes[mesh_index]
+        first_vertex = int(vertex_offset[mesh_index])
+
+        for key, (dtype, stride, width) in sections.items():
+            if key in decoded:
+                f.seek(layout[key] + first_vertex * stride)
+                decoded[key].append(read_array(f, dtype, mesh_vertex_count, width))
+
+        if 'face' in decoded:
+            f.seek(layout['face'] + int(face_offset[mesh_index]) * 6)
+            faces = read_array(f, '<u2', mesh_face_count, 3)
+            if first_vertex != new_vertex_offset:
+                faces = (faces.astype(np.int64) - first_vertex + new_vertex_offset).astype(np.uint16)
+            decoded['face'].append(faces)
+
+        if 'uv' in decoded:
+            if uv_layers > 0:
+                f.seek(int(layout['uv'][mesh_index]))
+                decoded['uv'].append(read_array(f, '<f4', mesh_vertex_count, 2))
+            else:
+                decoded['uv'].append(np.zeros((mesh_vertex_count, 2), dtype=np.float32))
+
+        new_vertex_offset += mesh_vertex_count
+
+    empty = {'face': ('<u2', 3), 'uv': ('<f4', 2)}
+    empty.update({key: (dtype, width) for key, (dtype, _, width) in sections.items()})
+    for key, arrays in decoded.items():
+        if len(arrays) == 1:
+            model[key] = arrays[0]
+        elif arrays:
+            model[key] = np.concatenate(arrays)
+        else:
+            model[key] = np.zeros((0, empty[key][1]), dtype=empty[key][0])
+
+    f.seek(layout['bone_tail'])
+    model['bone_tail'] = f.read(table_offset - layout['bone_tail'])
+    f.seek(table_offset)
+    model['lod_data_table'] = f.read()
+
+    model['mesh'] = [all_meshes[mesh_index] for mesh_index in selected]
+    model['submesh_index'] = np.array(selected, dtype=np.int64)
+    model.index_submeshes()
+    return model
+
+
 def parse_mesh_1(model: dict[str, Any], f: BinaryIO , operator) -> dict[str, Any]:
     _magic_number = f.read(8)
 
@@ -39,32 +506,16 @@ def parse_mesh_1(model: dict[str, Any], f: BinaryIO , operator) -> dict[str, Any
             f.read(2)
             f.read(count * 4)
         bone_count = readuint16(f)
-        
-        for _ in range(bone_count):
-            parent_node = readuint16(f)
-            if parent_node == 65535:
-                parent_node = -1
-            parent_nodes.append(parent_node)
+        parent_nodes = read_bone_parents(f, bone_count, '<u2')
         model['bone_parent'] = parent_nodes
 
-        bone_names = []
-        for _ in range(bone_count):
-            bone_name = f.read(32)
-            bone_name = bone_name.decode().replace('\0', '')
-            bone_names.append(bone_name)
-        model['bone_name'] = bone_names
+        model['bone_name'] = read_bone_names(f, bone_count)
 
         bone_binding_info = readuint8(f)        
         if bone_binding_info:
-            model['bounding_info'] = []
-            for _ in range(bone_count):                
-                model['bounding_info'].append(tuple(readfloat(f) for _ in range(7)))
+            model['bounding_info'] = read_bounding_info(f, bone_count)
 
-        model['bone_matrix'] = []
-        for _ in range(bone_count):
-            matrix = [readfloat(f) for _ in range(16)]
-            matrix = np.array(matrix).reshape(4, 4)
-            model['bone_matrix'].append(matrix)
+        model['bone_matrix'] = read_bone_matrices(f, bone_count)
 
     if len(list(filter(lambda x: x == -1, parent_nodes))) > 1:
         num = len(model['bone_parent'])
@@ -93,66 +544,33 @@ def parse_mesh_1(model: dict[str, Any], f: BinaryIO , operator) -> dict[str, Any
     vertex_count = readuint32(f)
     face_count = readuint32(f)
 
-    model['position'] = []
     # vertex position
-    for _ in range(vertex_count):
-        x = readfloat(f)
-        y = readfloat(f)
-        z = readfloat(f)
-        model['position'].append((x, y, z))
+    model['position'] = read_array(f, '<f4', vertex_count, 3)
 
-    model['normal'] = []
     # vertex normal
-    for _ in range(vertex_count):
-        x = readfloat(f)
-        y = readfloat(f)
-        z = readfloat(f)
-        model['normal'].append((x, y, z))
+    model['normal'] = read_array(f, '<f4', vertex_count, 3)
 
     has_tangent = readuint16(f)
     if has_tangent:
         f.seek(vertex_count * 12, 1)
 
-    model['face'] = []
     # face index table
-    for _ in range(face_count):
-        v1 = readuint16(f)
-        v2 = readuint16(f)
-        v3 = readuint16(f)
-        model['face'].append((v1, v2, v3))
+    model['face'] = read_array(f, '<u2', face_count, 3)
 
-    model['uv'] = []
     # vertex uv
-    for mesh_vertex_count, _, uv_layers, _ in model['mesh']:
-        if uv_layers > 0:
-            for _ in range(mesh_vertex_count):
-                u = readfloat(f)
-                v = readfloat(f)
-                model['uv'].append((u, v))
-            f.read(mesh_vertex_count * 8 * (uv_layers - 1))
-        else:
-            for _ in range(mesh_vertex_count):
-                u = 0.0
-                v = 0.0
-                model['uv'].append((u, v))        
+    model['uv'] = read_uv(f, model['mesh'])
     
     # vertex color
     for mesh_vertex_count, _, _, color_len in model['mesh']:
-        f.read(mesh_vertex_count * 4 * color_len)
+        f.seek(mesh_vertex_count * 4 * color_len, 1)
 
     if model['bone_exist']:
-        model['vertex_bone'] = []
-        for _ in range(vertex_count):
-            vertex_bones = [readuint16(f) for _ in range(4)]
-            model['vertex_bone'].append(vertex_bones)
+        model['vertex_bone'] = read_array(f, '<u2', vertex_count, 4)
 
         # with open("C:\\Users\\Shirin\\AppData\\Roaming\\Blender Foundation\\Blender\\3.6\scripts\\addons\\IDVMI_Tools\\neox_tools\\joints.txt", "w") as www:
         #     www.write(f"{model['vertex_bone']}")
 
-        model['vertex_weight'] = []
-        for _ in range(vertex_count):
-            vertex_weights = [readfloat(f) for _ in range(4)]
-            model['vertex_weight'].append(vertex_weights)        
+        model['vertex_weight'] = read_array(f, '<f4', vertex_count, 4)
 
         # with open("C:\\Users\\Shirin\\AppData\\Roaming\\Blender Foundation\\Blender\\3.6\scripts\\addons\\IDVMI_Tools\\neox_tools\\weights.txt", "w") as www:
         #     www.write(f"{model['vertex_weight']}")
@@ -163,7 +581,7 @@ def parse_mesh_1(model: dict[str, Any], f: BinaryIO , operator) -> dict[str, Any
     
     f.seek(table_offset)
 
-    model['lod_data_table'] = f.read(16)
+    model['lod_data_table'] = f.read()
 
     return model
 
@@ -183,32 +601,16 @@ def parse_mesh_2(model, f, operator):
             f.read(2)
             f.read(count * 4)
         bone_count = readuint16(f)
-        parent_nodes = []
-        for _ in range(bone_count):
-            parent_node = readuint16(f)
-            if parent_node == 65535:
-                parent_node = -1
-            parent_nodes.append(parent_node)
+        parent_nodes = read_bone_parents(f, bone_count, '<u2')
         model['bone_parent'] = parent_nodes
 
-        bone_names = []
-        for _ in range(bone_count):
-            bone_name = f.read(32)
-            bone_name = bone_name.decode().replace('\0', '')#.replace(' ', '_')
-            bone_names.append(bone_name)
-        model['bone_name'] = bone_names
+        model['bone_name'] = read_bone_names(f, bone_count)
         
         bone_binding_info = readuint8(f)        
         if bone_binding_info:
-            model['bounding_info'] = []
-            for _ in range(bone_count):                
-                model['bounding_info'].append(tuple(readfloat(f) for _ in range(7)))
+            model['bounding_info'] = read_bounding_info(f, bone_count)
 
-        model['bone_matrix'] = []
-        for i in range(bone_count):
-            matrix = [readfloat(f) for _ in range(16)]
-            matrix = np.array(matrix).reshape(4, 4)
-            model['bone_matrix'].append(matrix)
+        model['bone_matrix'] = read_bone_matrices(f, bone_count)
 
         if len(list(filter(lambda x: x == -1, parent_nodes))) > 1:
             num = len(model['bone_parent'])
@@ -246,70 +648,35 @@ def parse_mesh_2(model, f, operator):
     print(f"Vertex count: {vertex_count}")
     print(f"face count: {face_count}")
 
-    model['position'] = []
     # vertex position
-    for _ in range(vertex_count):
-        x = readfloat(f)
-        y = readfloat(f)
-        z = readfloat(f)
-        model['position'].append((x, y, z))
+    model['position'] = read_array(f, '<f4', vertex_count, 3)
 
-    model['normal'] = []
     # vertex normal
-    for _ in range(vertex_count):
-        x = readfloat(f)
-        y = readfloat(f)
-        z = readfloat(f)
-        model['normal'].append((x, y, z))
+    model['normal'] = read_array(f, '<f4', vertex_count, 3)
 
     has_tangent = readuint16(f)
     if has_tangent:
-        model['tangent'] = []
-        for _ in range(vertex_count):
-            model['tangent'].append(tuple(readfloat(f) for _ in range(3)))
+        model['tangent'] = read_array(f, '<f4', vertex_count, 3)
         # f.seek(vertex_count * 12, 1)
 
-    model['face'] = []
     # face index table
-    for _ in range(face_count):
-        v1 = readuint16(f)
-        v2 = readuint16(f)
-        v3 = readuint16(f)
-        model['face'].append((v1, v2, v3))
+    model['face'] = read_array(f, '<u2', face_count, 3)
 
-    model['uv'] = []
     # vertex uv
-    for mesh_vertex_count, _, uv_layers, _ in model['mesh']:
-        if uv_layers > 0:
-            for _ in range(mesh_vertex_count):
-                u = readfloat(f)
-                v = readfloat(f)
-                model['uv'].append((u, v))
-            f.read(mesh_vertex_count * 8 * (uv_layers - 1))
-        else:
-            for _ in range(mesh_vertex_count):
-                u = 0.0
-                v = 0.0
-                model['uv'].append((u, v))
+    model['uv'] = read_uv(f, model['mesh'])
 
     # vertex color
     model['vertex_color'] = []
     for mesh_vertex_count, _, _, color_len in model['mesh']:
-        f.read(mesh_vertex_count * 4 * color_len)
+        f.seek(mesh_vertex_count * 4 * color_len, 1)
         # if color_len > 0:
         #     model['vertex_color'].append(tuple(tuple(readuint8(f) for __ in range(4)) for _ in range(color_len) for _ in range(mesh_vertex_count)))
 
     if model['bone_exist']:
-        model['vertex_bone'] = []
-        for _ in range(vertex_count):
-            vertex_joints = [readuint16(f) for _ in range(4)]
-            model['vertex_bone'].append(vertex_joints)
+        model['vertex_bone'] = read_array(f, '<u2', vertex_count, 4)
 
         # operator.report({'INFO'}, f"{f.tell()}")
-        model['vertex_weight'] = []
-        for _ in range(vertex_count):
-            vertex_joint_weights = [readfloat(f) for _ in range(4)]
-            model['vertex_weight'].append(vertex_joint_weights)
+        model['vertex_weight'] = read_array(f, '<f4', vertex_count, 4)
 
         # with open("C:\\Users\\Shirin\\AppData\\Roaming\\Blender Foundation\\Blender\\3.6\\scripts\\addons\\IDVMI_Tools\\neox_tools\\weights.txt", "w") as www:
         #     www.write(f"{model['vertex_joint_weight']}")
@@ -320,13 +687,7 @@ def parse_mesh_2(model, f, operator):
     
     f.seek(table_offset)
 
-    model['lod_data_table'] = f.read(16)
-
-    # model['block_count'] = readuint16(f)
-    # model['block_infos'] = readuint32(f)
-    # model['pair_count'] = readuint16(f)
-    # model['lod'] = readuint32(f)
-    # model['block_idx'] = readuint32(f)
+    model['lod_data_table'] = f.read()
 
     return model
 
@@ -352,33 +713,16 @@ def parse_mesh_3(model: dict[str, Any], f: BinaryIO, operator) -> dict[str, Any]
             f.read(2)
             f.read(count * 4)
         bone_count = readuint16(f)
-        
-        parent_nodes = []
-        for _ in range(bone_count):
-            parent_node = readuint8(f)
-            if parent_node == 255:
-                parent_node = -1
-            parent_nodes.append(parent_node)
+        parent_nodes = read_bone_parents(f, bone_count, 'u1')
         model['bone_parent'] = parent_nodes
 
-        bone_names = []
-        for _ in range(bone_count):
-            bone_name = f.read(32)
-            bone_name = bone_name.decode().replace('\0', '')
-            bone_names.append(bone_name)
-        model['bone_name'] = bone_names
+        model['bone_name'] = read_bone_names(f, bone_count)
 
         bone_binding_info = readuint8(f)        
         if bone_binding_info:
-            model['bounding_info'] = []
-            for _ in range(bone_count):                
-                model['bounding_info'].append(tuple(readfloat(f) for _ in range(7)))
+            model['bounding_info'] = read_bounding_info(f, bone_count)
 
-        model['bone_matrix'] = []
-        for _ in range(bone_count):
-            matrix = [readfloat(f) for _ in range(16)]
-            matrix = np.array(matrix).reshape(4, 4)
-            model['bone_matrix'].append(matrix)
+        model['bone_matrix'] = read_bone_matrices(f, bone_count)
 
         if len(list(filter(lambda x: x == -1, parent_nodes))) > 1:
             num = len(model['bone_parent'])
@@ -408,63 +752,30 @@ def parse_mesh_3(model: dict[str, Any], f: BinaryIO, operator) -> dict[str, Any]
     vertex_count = readuint32(f)
     face_count = readuint32(f)
 
-    model['position'] = []
     # vertex position
-    for _ in range(vertex_count):
-        x = readfloat(f)
-        y = readfloat(f)
-        z = readfloat(f)
-        model['position'].append((x, y, z))
+    model['position'] = read_array(f, '<f4', vertex_count, 3)
 
-    model['normal'] = []
     # vertex normal
-    for _ in range(vertex_count):
-        x = readfloat(f)
-        y = readfloat(f)
-        z = readfloat(f)
-        model['normal'].append((x, y, z))
+    model['normal'] = read_array(f, '<f4', vertex_count, 3)
 
     _flag = readuint16(f)
     if _flag:
         f.seek(vertex_count * 12, 1)
 
-    model['face'] = []
     # face index table
-    for _ in range(face_count):
-        v1 = readuint16(f)
-        v2 = readuint16(f)
-        v3 = readuint16(f)
-        model['face'].append((v1, v2, v3))
+    model['face'] = read_array(f, '<u2', face_count, 3)
 
-    model['uv'] = []
     # vertex uv
-    for mesh_vertex_count, _, uv_layers, _ in model['mesh']:
-        if uv_layers > 0:
-            for _ in range(mesh_vertex_count):
-                u = readfloat(f)
-                v = readfloat(f)
-                model['uv'].append((u, v))
-            f.read(mesh_vertex_count * 8 * (uv_layers - 1))
-        else:
-            for _ in range(mesh_vertex_count):
-                u = 0.0
-                v = 0.0
-                model['uv'].append((u, v))
+    model['uv'] = read_uv(f, model['mesh'])
 
     # vertex color
     for mesh_vertex_count, _, _, color_len in model['mesh']:
-        f.read(mesh_vertex_count * 4 * color_len)
+        f.seek(mesh_vertex_count * 4 * color_len, 1)
 
     if model['bone_exist']:
-        model['vertex_bone'] = []
-        for _ in range(vertex_count):
-            vertex_bones = [readuint8(f) for _ in range(4)]
-            model['vertex_bone'].append(vertex_bones)
+        model['vertex_bone'] = read_array(f, 'u1', vertex_count, 4)
 
-        model['vertex_weight'] = []
-        for _ in range(vertex_count):
-            vertex_weights = [readfloat(f) for _ in range(4)]
-            model['vertex_weight'].append(vertex_weights)
+        model['vertex_weight'] = read_array(f, '<f4', vertex_count, 4)
 
     # footer
     bone_tail_size = table_offset - f.tell()
@@ -472,6 +783,9 @@ def parse_mesh_3(model: dict[str, Any], f: BinaryIO, operator) -> dict[str, Any]
     
     f.seek(table_offset)
 
-    model['lod_data_table'] = f.read(16)
+    model['lod_data_table'] = f.read()
+
+    return model
+
 
-    return model
\ No newline at end of file
+PARSERS = {parser.__name__: parser for parser in (parse_mesh_1, parse_mesh_2, parse_mesh_3)}
@@ -0,0 +1,73 @@
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Bump when the blob layout changes; unpack() refuses versions it doesn't know
+METADATA_VERSION = 2
+METADATA_MAGIC = b"NXMD"
+
+# magic, version, has bounding info, bone count, bounding info count, bone tail size, LOD table size
+HEADER = struct.Struct('<4sHBxIIII')
+
+
+@dataclass
+class RoundTripMetadata:
+    """File sections the exporter writes back unchanged, packed into one blob for the armature.
+
+    Layout: header, bone matrices (float32 x16 per bone), bounding info (float32 x7 per
+    bone, only when present), bone tail bytes, LOD table bytes. The two row counts are
+    stored apart: a skeleton with several roots gets a dummy root bone matrix, but no
+    bounding info row for it.
+    """
+    bone_matrix: np.ndarray
+    bounding_info: Optional[np.ndarray]
+    bone_tail: bytes
+    lod_data_table: bytes
+
+    @classmethod
+    def from_mesh(cls, model) -> 'RoundTripMetadata':
+        bone_matrix = np.asarray(model['bone_matrix'], dtype='<f4').reshape(-1, 16)
+        bounding_info = model.get('bounding_info')
+        if bounding_info is not None:
+            bounding_info = np.asarray(bounding_info, dtype='<f4').reshape(-1, 7)
+        return cls(bone_matrix, bounding_info, bytes(model['bone_tail']), bytes(model['lod_data_table']))
+
+    def pack(self) -> bytes:
+        bounding_count = 0 if self.bounding_info is None else len(self.bounding_info)
+        header = HEADER.pack(METADATA_MAGIC, METADATA_VERSION, self.bounding_info is not None,
+                             len(self.bone_matrix), bounding_count, len(self.bone_tail),
+                             len(self.lod_data_table))
+        sections = [header, np.ascontiguousarray(self.bone_matrix, dtype='<f4').tobytes()]
+        if self.bounding_info is not None:
+            sections.append(np.ascontiguousarray(self.bounding_info, dtype='<f4').tobytes())
+        sections += [self.bone_tail, self.lod_data_table]
+        return b"".join(sections)
+
+    @classmethod
+    def unpack(cls, blob: bytes) -> 'RoundTripMetadata':
+        if len(blob) < HEADER.size or blob[:4] != METADATA_MAGIC:
+            raise ValueError("Not a NeoX metadata blob")
+        _magic, version, has_bounding_info, bone_count, bounding_count, tail_size, table_size = \
+            HEADER.unpack_from(blob)
+        if version != METADATA_VERSION:
+            raise ValueError(f"Unsupported NeoX metadata version {version}, expected {METADATA_VERSION}")
+        if not has_bounding_info:
+            bounding_count = 0
+        size = HEADER.size + (bone_count * 16 + bounding_count * 7) * 4 + tail_size + table_size
+        if len(blob) != size:
+            raise ValueError(f"NeoX metadata blob is {len(blob)} bytes, its header describes {size}")
+
+        offset = HEADER.size
+        bone_matrix = np.frombuffer(blob, dtype='<f4', count=bone_count * 16, offset=offset).reshape(-1, 16)
+        offset += bone_matrix.nbytes
+
+        bounding_info = None
+        if has_bounding_info:
+            bounding_info = np.frombuffer(blob, dtype='<f4', count=bounding_count * 7, offset=offset).reshape(-1, 7)
+            offset += bounding_info.nbytes
+
+        bone_tail = blob[offset:offset + tail_size]
+        lod_data_table = blob[offset + tail_size:offset + tail_size + table_size]
+        return cls(bone_matrix, bounding_info, bone_tail, lod_data_table)
@@ -0,0 +1,100 @@
+"""Synthetic .mesh files for testing and benchmarking the decoders without game assets."""
+import os
+import struct
+
+import numpy as np
+
+MAGIC_NUMBER = b"\x34\x80\xC8\xBB"
+FILE_VERSION = b"\x04\x00\x05\x00"
+
+
+def split_counts(total: int, parts: int) -> list[int]:
+    counts = [total // parts + (1 if n < total % parts else 0) for n in range(parts)]
+    # a submesh entry whose low 16 bits read as 1 would end the submesh table early
+    for n, count in enumerate(counts):
+        if count & 0xFFFF == 1:
+            counts[n] += 1
+            counts[(n + 1) % parts] -= 1
+    return counts
+
+
+def make_mesh(vertex_count: int = 10000, face_count: int = None, bone_count: int = 64, submesh_count: int = 1,
+              index_width: int = 2, tangents: bool = True, bounding_info: bool = True, uv_layers: int = 1,
+              color_len: int = 0, seed: int = 0) -> bytes:
+    """Bytes of a skinned .mesh file in the layout parse_mesh_1 (uint16) or parse_mesh_3 (uint8) reads.
+
+    `index_width` is the byte width of bone parents and vertex joints. Face indices are uint16
+    and global, so past 65536 vertices they wrap around; such files still decode but won't
+    pass validation.
+    """
+    if index_width == 1 and bone_count > 254:
+        raise ValueError("uint8 bone tables hold at most 254 bones")
+    if face_count is None:
+        face_count = vertex_count * 2
+    rng = np.random.default_rng(seed)
+    index_dtype = '<u2' if index_width == 2 else 'u1'
+    no_index = 65535 if index_width == 2 else 255
+
+    data = bytearray(MAGIC_NUMBER + FILE_VERSION)
+    data += struct.pack('<IH', 1, bone_count)
+
+    parents = np.array([no_index] + [rng.integers(0, n) for n in range(1, bone_count)])
+    data += parents.astype(index_dtype).tobytes()
+    for n in range(bone_count):
+        data += f"bone_{n:03d}".encode().ljust(32, b"\0")
+
+    data += struct.pack('B', 1 if bounding_info else 0)
+    if bounding_info:
+        data += rng.random((bone_count, 7), dtype=np.float32).tobytes()
+    matrices = np.tile(np.identity(4, dtype=np.float32), (bone_count, 1, 1))
+    matrices[:, 3, :3] = rng.random((bone_count, 3), dtype=np.float32)
+    data += matrices.tobytes()
+    data += b"\0"  # has_binding_info
+
+    table_offset = len(data)
+    data += b"\0\0\0\0"
+    vertex_counts = split_counts(vertex_count, submesh_count)
+    face_counts = split_counts(face_count, submesh_count)
+    for mesh_vertex_count, mesh_face_count in zip(vertex_counts, face_counts):
+        data += struct.pack('<IIBB', mesh_vertex_count, mesh_face_count, uv_layers, color_len)
+    data += struct.pack('<HII', 1, vertex_count, face_count)
+
+    data += rng.standard_normal((vertex_count, 3), dtype=np.float32).tobytes()
+    normals = rng.standard_normal((vertex_count, 3), dtype=np.float32)
+    data += (normals / np.linalg.norm(normals, axis=1, keepdims=True)).tobytes()
+    data += struct.pack('<H', 1 if tangents else 0)
+    if tangents:
+        data += rng.standard_normal((vertex_count, 3), dtype=np.float32).tobytes()
+
+    first_vertex = 0
+    faces = []
+    for mesh_vertex_count, mesh_face_count in zip(vertex_counts, face_counts):
+        faces.append(first_vertex + rng.integers(0, max(mesh_vertex_count, 1), (mesh_face_count, 3)))
+        first_vertex += mesh_vertex_count
+    data += (np.concatenate(faces) & 0xFFFF).astype('<u2').tobytes()
+
+    for mesh_vertex_count in vertex_counts:
+        data += rng.random((mesh_vertex_count, 2 * uv_layers), dtype=np.float32).tobytes()
+    for mesh_vertex_count in vertex_counts:
+        data += rng.integers(0, 256, mesh_vertex_count * 4 * color_len, dtype=np.uint8).tobytes()
+
+    joints = rng.integers(0, bone_count, (vertex_count, 4))
+    weights = -np.sort(-rng.random((vertex_count, 4), dtype=np.float32), axis=1)
+    weights[:, 3] = 0.0
+    joints[:, 3] = no_index
+    weights /= weights.sum(axis=1, keepdims=True)
+    data += joints.astype(index_dtype).tobytes()
+    data += weights.astype('<f4').tobytes()
+
+    data += bytes(16)  # bone tail
+    struct.pack_into('<I', data, table_offset, len(data))
+    data += struct.pack('<HIHII', 1, 0, 1, 0, 0)  # one LOD starting at submesh 0
+    return bytes(data)
+
+
+def write_mesh(mesh_path: os.PathLike, **options) -> int:
+    """Write make_mesh(**options) to `mesh_path` and return its size in bytes."""
+    data = make_mesh(**options)
+    with open(mesh_path, "wb") as mesh_file:
+        mesh_file.write(data)
+    return len(data)
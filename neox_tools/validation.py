@@ -0,0 +1,98 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .neox_mesh import NeoXMesh
+
+# Per-vertex weight sums further than this from 1.0 get a warning
+WEIGHT_SUM_TOLERANCE = 1e-3
+# Single weights this far outside [0, 1] are float noise and only get a warning
+WEIGHT_RANGE_TOLERANCE = 1e-3
+
+
+@dataclass
+class ValidationIssue:
+    check: str
+    count: int
+    message: str
+    fatal: bool
+
+
+@dataclass
+class ValidationReport:
+    issues: list[ValidationIssue] = field(default_factory=list)
+
+    @property
+    def accepted(self) -> bool:
+        return not any(issue.fatal for issue in self.issues)
+
+    @property
+    def errors(self) -> list[ValidationIssue]:
+        return [issue for issue in self.issues if issue.fatal]
+
+    @property
+    def warnings(self) -> list[ValidationIssue]:
+        return [issue for issue in self.issues if not issue.fatal]
+
+    def add(self, check: str, count: int, message: str, fatal: bool):
+        if count:
+            self.issues.append(ValidationIssue(check, int(count), message, fatal))
+
+    def __str__(self) -> str:
+        lines = [f"{'accepted' if self.accepted else 'rejected'}, {len(self.errors)} error(s), {len(self.warnings)} warning(s)"]
+        lines += [f"  [{'ERROR' if issue.fatal else 'WARNING'}] {issue.check}: {issue.message} ({issue.count})" for issue in self.issues]
+        return "\n".join(lines)
+
+
+def validate_mesh(mesh: NeoXMesh) -> ValidationReport:
+    """Check a decoded mesh with whole-array operations and decide whether it can be imported.
+
+    Non-finite geometry or weights, weights clearly outside [0, 1], joints past the bone
+    table and faces that reach outside their submesh reject the mesh. Weights just outside
+    [0, 1], weight sums away from 1.0, unweighted vertices and non-finite UVs only warn.
+    """
+    report = ValidationReport()
+
+    for key in ('position', 'normal'):
+        values = mesh[key]
+        report.add(f"{key}_finite", (~np.isfinite(values)).any(axis=1).sum(),
+                   f"{key}s with NaN/Inf values", True)
+    if 'uv' in mesh:
+        report.add("uv_finite", (~np.isfinite(mesh['uv'])).any(axis=1).sum(), "UVs with NaN/Inf values", False)
+
+    if 'vertex_weight' in mesh:
+        weights = mesh['vertex_weight']
+        finite = np.isfinite(weights)
+        report.add("weight_finite", (~finite).any(axis=1).sum(), "vertices with NaN/Inf weights", True)
+        low, high = -WEIGHT_RANGE_TOLERANCE, 1.0 + WEIGHT_RANGE_TOLERANCE
+        report.add("weight_range", (finite & ((weights < low) | (weights > high))).any(axis=1).sum(),
+                   f"vertices with weights outside [0, 1] (±{WEIGHT_RANGE_TOLERANCE})", True)
+        overshoot = (weights >= low) & (weights <= high) & ((weights < 0.0) | (weights > 1.0))
+        report.add("weight_overshoot", overshoot.any(axis=1).sum(),
+                   "vertices with weights slightly outside [0, 1]", False)
+
+        sums = weights.sum(axis=1, dtype=np.float64)
+        weighted = sums > 0.0
+        report.add("weight_sum", (weighted & (np.abs(sums - 1.0) > WEIGHT_SUM_TOLERANCE)).sum(),
+                   f"vertices whose weights don't sum to 1 (±{WEIGHT_SUM_TOLERANCE})", False)
+        report.add("weight_unweighted", (~weighted).sum(), "vertices without any weight", False)
+
+    if 'vertex_bone' in mesh:
+        joints = mesh['vertex_bone']
+        no_joint = np.iinfo(joints.dtype).max
+        bone_count = len(mesh.get('bone_name', []))
+        bad = (joints != no_joint) & (joints >= bone_count)
+        report.add("joint_range", bad.any(axis=1).sum(), f"vertices with joints past the {bone_count} bones", True)
+
+    faces = mesh['face']
+    face_total = int(mesh.face_count.sum())
+    if len(faces) != face_total:
+        report.add("face_count", abs(len(faces) - face_total),
+                   f"{len(faces)} faces decoded but the submesh table lists {face_total}", True)
+    else:
+        first = np.repeat(mesh.vertex_offset, mesh.face_count)[:, None]
+        end = first + np.repeat(mesh.vertex_count, mesh.face_count)[:, None]
+        bad = (faces < first) | (faces >= end)
+        report.add("face_range", bad.any(axis=1).sum(), "faces pointing outside their submesh's vertices", True)
+
+    return report